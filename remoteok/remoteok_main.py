@@ -1,17 +1,24 @@
+import csv
 import datetime
+import functools
+import io
 import json
 import os
+import queue
 import re
-import time
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Tuple, Set, Optional, Dict
+from typing import Callable, List, Tuple, Set, FrozenSet, Optional, Dict, Pattern
+from urllib.parse import urljoin
 
 import psycopg2
+import requests
 from dotenv import load_dotenv
-from psycopg2.extras import execute_values
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
@@ -19,19 +26,98 @@ from webdriver_manager.chrome import ChromeDriverManager
 import geonamescache
 import pycountry
 
-# ================== CONFIG ==================
+# ixtiyoriy: pip install pyahocorasick (yo'q bo'lsa regex fallback)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# ixtiyoriy: pip install orjson (yo'q bo'lsa stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ================== ENV HELPERS ==================
 load_dotenv()
 
+
+def env_required(key: str) -> str:
+    v = os.getenv(key)
+    if not v:
+        raise RuntimeError(f".env da {key} yo‘q yoki bo‘sh!")
+    return v
+
+
+def env_bool(key: str, default: bool = False) -> bool:
+    v = os.getenv(key)
+    if v is None:
+        return default
+    return v.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_int(key: str, default: int) -> int:
+    try:
+        return int(os.getenv(key, str(default)))
+    except Exception:
+        return default
+
+
+# ================== CONFIG ==================
 BASE_DIR = Path(__file__).resolve().parent
 JOBS_PATH = Path(os.getenv("JOBS_PATH", str(BASE_DIR / "job_list.json")))
 
 REMOTEOK_URL = "https://remoteok.com/"
+REMOTEOK_API_URL = "https://remoteok.com/api"
 SOURCE_NAME = "remoteok"
 
-MAX_SCROLLS_PER_KEYWORD = 60   # har keyword uchun scroll limiti
-SCROLL_PAUSE = 1.1
-NO_NEW_LIMIT = 6
-HEADLESS = False
+# api:     https://remoteok.com/api JSON (Chrome kerak emas), keyword bo'yicha filter
+# keyword: har keyword uchun /remote-<kw>-jobs sahifasi (parallel worker'lar)
+# feed:    bosh sahifani scroll qilib, keyword bo'yicha filter
+MODES = ("api", "keyword", "feed")
+# Diqqat: default api (oldin keyword edi) — api/feed rejimida yangi row'larda job_subtitle NULL;
+# eski xatti-harakat uchun: REMOTEOK_MODE=keyword
+DEFAULT_MODE = os.getenv("REMOTEOK_MODE", "api").strip().lower()
+
+# API User-Agent'siz so'rovlarni rad etadi
+API_USER_AGENT = os.getenv(
+    "REMOTEOK_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+)
+API_TIMEOUT = env_int("REMOTEOK_API_TIMEOUT", 30)
+
+MAX_SCROLLS = env_int("MAX_SCROLLS", 60)   # har sahifa uchun scroll limiti
+# scrolldan keyin yangi row'larni kutish chegarasi; row'lar kelishi bilan wait darhol qaytadi,
+# shuning uchun ceiling faqat sekin javob / ro'yxat oxirida sarflanadi
+SCROLL_TIMEOUT = float(os.getenv("SCROLL_TIMEOUT", "5"))
+# har "no new" — SCROLL_TIMEOUT davomida DOM o'smagani, ketma-ket 3 ta yetarli
+NO_NEW_LIMIT = env_int("NO_NEW_LIMIT", 3)
+
+# har worker o'z Chrome'iga ega; DB ga bitta writer thread yozadi
+MAX_WORKERS = env_int("REMOTEOK_WORKERS", 4)
+DB_WRITE_BATCH = env_int("DB_WRITE_BATCH", 1000)   # bitta COPY round-trip ga ketadigan row soni
+
+# ================== BROWSER SETTINGS (.env) ==================
+HEADLESS = env_bool("HEADLESS", False)
+PAGE_LOAD_TIMEOUT = env_int("PAGE_LOAD_TIMEOUT", 30)
+CHROME_WINDOW_SIZE = os.getenv("CHROME_WINDOW_SIZE", "1920,1080")
+
+# CI da o'chirish uchun: USE_CHROME_PROFILE=false
+USE_CHROME_PROFILE = env_bool("USE_CHROME_PROFILE", True)
+CHROME_PROFILE_DIR = Path(os.getenv("CHROME_PROFILE_DIR", str(BASE_DIR / ".chrome-profile")))
+
+# ================== DB SETTINGS (.env) ==================
+# UNLOGGED table crash'dan keyin bo'shab qoladi va replica'ga bormaydi -> faqat ongli ravishda yoqiladi
+REMOTEOK_UNLOGGED = env_bool("REMOTEOK_UNLOGGED", False)
+# true bo'lsa DB da bor job_id'lar run boshida yuklanadi va qayta parse/yozilmaydi
+# (tezroq, lekin eski row'lar ON CONFLICT DO UPDATE bilan yangilanmaydi -> default false)
+REMOTEOK_SKIP_KNOWN = env_bool("REMOTEOK_SKIP_KNOWN", False)
+
+
+# ================== REGEX ==================
+# har row/field da chaqiriladi -> bir marta compile qilib qo'yamiz
+_NORM_RE = re.compile(r"[^a-z0-9]+")
+_WS_RE = re.compile(r"\s+")
 
 
 # ================== SALARY NORMALIZER (REMOTEOK: $40k - $120k) ==================
@@ -45,7 +131,7 @@ def normalize_salary_k_range(raw: Optional[str]) -> Optional[str]:
 
     # remove emoji + weird spaces
     s = re.sub(r"[💰\n\r\t]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WS_RE.sub(" ", s).strip()
 
     # ignore premium text
     if "upgrade to premium" in s.lower():
@@ -222,7 +308,7 @@ def extract_country_name_and_code(location: Optional[str]) -> Tuple[Optional[str
     low = low.replace("&", " and ")
     low = re.sub(r"\bor\s+remote\b", " remote ", low)
     low = re.sub(r"\bor\b", " ", low)
-    low = re.sub(r"\s+", " ", low).strip()
+    low = _WS_RE.sub(" ", low).strip()
 
     chunks = re.split(r"[;|/]", low)
     chunks = [c.strip() for c in chunks if c.strip()]
@@ -299,13 +385,6 @@ def extract_country_name_and_code(location: Optional[str]) -> Tuple[Optional[str
 
 
 # ================== DB ==================
-def env_required(key: str) -> str:
-    v = os.getenv(key)
-    if not v:
-        raise RuntimeError(f".env da {key} yo‘q yoki bo‘sh!")
-    return v
-
-
 def open_db():
     return psycopg2.connect(
         host=env_required("DB_HOST"),
@@ -317,8 +396,10 @@ def open_db():
 
 
 def ensure_table_exists(conn):
-    sql = """
-    CREATE TABLE IF NOT EXISTS public.remoteok (
+    # REMOTEOK_UNLOGGED=true bo'lsa WAL'siz table (faqat yangi yaratilganda; default oddiy table)
+    unlogged = "UNLOGGED " if REMOTEOK_UNLOGGED else ""
+    sql = f"""
+    CREATE {unlogged}TABLE IF NOT EXISTS public.remoteok (
         id BIGSERIAL PRIMARY KEY,
         job_id TEXT NOT NULL UNIQUE,
         source TEXT NOT NULL,
@@ -351,17 +432,87 @@ def ensure_table_exists(conn):
     conn.commit()
 
 
-def insert_rows(conn, rows: List[Tuple]) -> int:
+ROW_COLUMNS = (
+    "job_id", "source", "job_title", "company_name", "location", "country", "country_code",
+    "salary", "job_type", "skills", "education", "job_url", "page",
+    "posted_at", "posted_date", "job_subtitle",
+)
+# row_hay() uchun: keyword filter matni shu ustunlardan yig'iladi
+_HAY_IDXS = tuple(ROW_COLUMNS.index(c) for c in ("job_title", "company_name", "location", "skills"))
+
+
+def load_known_ids(conn) -> FrozenSet[str]:
+    """
+    DB dagi mavjud job_id'larni bitta SELECT bilan oladi.
+    Named (server-side) cursor -> katta jadvalda ham xotiraga bo'lib-bo'lib keladi.
+    """
+    with conn.cursor(name="remoteok_known_ids") as cur:
+        cur.itersize = 10000
+        cur.execute("SELECT job_id FROM public.remoteok WHERE source = %s;", (SOURCE_NAME,))
+        known = frozenset(r[0] for r in cur)
+    conn.commit()
+    return known
+
+
+def ensure_stage_table(cur):
+    # TEMP table: sessiya tugaganda o'zi o'chadi, WAL yozilmaydi
+    cur.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS remoteok_stage (
+            seq BIGSERIAL,
+            job_id TEXT,
+            source TEXT,
+            job_title TEXT,
+            company_name TEXT,
+            location TEXT,
+            country TEXT,
+            country_code TEXT,
+            salary TEXT,
+            job_type TEXT,
+            skills TEXT,
+            education TEXT,
+            job_url TEXT,
+            page INT,
+            posted_at TIMESTAMP,
+            posted_date DATE,
+            job_subtitle TEXT
+        );
+        """
+    )
+
+
+def stage_rows(cur, rows: List[Tuple]) -> int:
+    """
+    Row'larni COPY orqali remoteok_stage ga yozadi (commit qilmaydi).
+    """
     if not rows:
         return 0
 
-    sql = """
-    INSERT INTO public.remoteok (
-        job_id, source, job_title, company_name, location, country, country_code,
-        salary, job_type, skills, education, job_url, page,
-        posted_at, posted_date, job_subtitle
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+
+    cur.copy_expert(
+        f"COPY remoteok_stage ({', '.join(ROW_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+        buf,
     )
-    VALUES %s
+    return len(rows)
+
+
+def upsert_from_stage(cur) -> Tuple[int, int]:
+    """
+    remoteok_stage -> public.remoteok bitta INSERT ... SELECT bilan.
+    Bir job_id bir nechta keyword'da chiqsa, oxirgi yozilgani qoladi.
+    returns: (inserted, updated) — RETURNING (xmax = 0) server tomonda sanaladi,
+    har row uchun flag client'ga tashilmaydi
+    """
+    cols = ", ".join(ROW_COLUMNS)
+    sql = f"""
+    WITH up AS (
+    INSERT INTO public.remoteok ({cols})
+    SELECT DISTINCT ON (job_id, source) {cols}
+    FROM remoteok_stage
+    ORDER BY job_id, source, seq DESC
     ON CONFLICT (job_id, source) DO UPDATE SET
         job_title     = EXCLUDED.job_title,
         company_name  = EXCLUDED.company_name,
@@ -376,12 +527,15 @@ def insert_rows(conn, rows: List[Tuple]) -> int:
         page          = EXCLUDED.page,
         posted_at     = COALESCE(EXCLUDED.posted_at, public.remoteok.posted_at),
         posted_date   = COALESCE(EXCLUDED.posted_date, public.remoteok.posted_date),
-        job_subtitle  = COALESCE(EXCLUDED.job_subtitle, public.remoteok.job_subtitle);
+        job_subtitle  = COALESCE(EXCLUDED.job_subtitle, public.remoteok.job_subtitle)
+    RETURNING (xmax = 0) AS inserted
+    )
+    SELECT count(*) FILTER (WHERE inserted), count(*) FROM up;
     """
-    with conn.cursor() as cur:
-        execute_values(cur, sql, rows, page_size=250)
-    conn.commit()
-    return len(rows)
+    cur.execute(sql)
+    inserted, total = cur.fetchone()
+    cur.execute("TRUNCATE remoteok_stage;")
+    return inserted, total - inserted
 
 
 # ================== KEYWORDS ==================
@@ -389,7 +543,8 @@ def load_keywords() -> List[str]:
     if not JOBS_PATH.exists():
         raise RuntimeError(f"job_list.json topilmadi: {JOBS_PATH}")
 
-    data = json.loads(JOBS_PATH.read_text(encoding="utf-8"))
+    raw = JOBS_PATH.read_bytes()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
     if isinstance(data, dict):
         for k in ("jobs", "keywords", "list"):
@@ -397,55 +552,224 @@ def load_keywords() -> List[str]:
                 data = data[k]
                 break
 
-    kws = []
+    # tartib saqlanadi, casefold bo'yicha birinchi uchragani qoladi
+    # (asl yozilishi job_subtitle sifatida DB ga tushadi)
+    by_key: Dict[str, str] = {}
     for x in data:
         s = str(x).strip()
         if s:
-            kws.append(s)
-
-    seen = set()
-    out = []
-    for k in kws:
-        kl = k.lower()
-        if kl not in seen:
-            seen.add(kl)
-            out.append(k)
-    return out
+            by_key.setdefault(s.casefold(), s)
+    return list(by_key.values())
 
 
 def keyword_to_remoteok_url(keyword: str) -> str:
-    slug = re.sub(r"[^a-z0-9]+", "-", keyword.strip().lower()).strip("-")
+    slug = _NORM_RE.sub("-", keyword.strip().lower()).strip("-")
     return f"https://remoteok.com/remote-{slug}-jobs"
 
 
+def normalize(s: Optional[str]) -> str:
+    return _NORM_RE.sub(" ", (s or "").lower()).strip()
+
+
+def keyword_tokens(keywords: List[str]) -> FrozenSet[str]:
+    return frozenset(t for kw in keywords for t in normalize(kw).split() if len(t) >= 2)
+
+
+def compile_keyword_re(tokens: FrozenSet[str]) -> Optional[Pattern[str]]:
+    """
+    Barcha token'lar uchun bitta alternation regex (substring match, `t in hay` bilan bir xil).
+    Uzunlari oldinda -> "javascript" "java" dan oldin tekshiriladi.
+    """
+    if not tokens:
+        return None
+    return re.compile("|".join(sorted(map(re.escape, tokens), key=len, reverse=True)))
+
+
+def build_keyword_matcher(tokens: FrozenSet[str]) -> Optional[Callable[[str], bool]]:
+    """
+    pyahocorasick o'rnatilgan bo'lsa — bitta automaton (hay uzunligiga chiziqli, token soniga bog'liq emas),
+    bo'lmasa — compile_keyword_re() alternation regex.
+    """
+    if not tokens:
+        return None
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for t in tokens:
+            automaton.add_word(t, t)
+        automaton.make_automaton()
+        return lambda hay: next(automaton.iter(hay), None) is not None
+
+    keyword_re = compile_keyword_re(tokens)
+    return lambda hay: keyword_re.search(hay) is not None
+
+
+def row_hay(row: Tuple) -> str:
+    """
+    normalize(title company location skills) — faqat feed/api filter'ida kerak (keyword rejimida hisoblanmaydi).
+    """
+    return normalize(" ".join(row[i] or "" for i in _HAY_IDXS))
+
+
+def match_keywords(hay: str, matcher: Optional[Callable[[str], bool]]) -> bool:
+    """
+    hay — row_hay() natijasi (row uchun bir marta).
+    """
+    if matcher is None:
+        # keyword list bo‘sh bo‘lsa — hammasini qo‘shib yuboramiz
+        return True
+
+    if not hay:
+        return False
+
+    return matcher(hay)
+
+
+# ================== JOB TYPE (tags) ==================
+# tartib muhim: bir nechta tag bo'lsa, birinchi mos kelgani olinadi
+JOB_TYPE_MAP = {
+    "full-time": "Full-time",
+    "full time": "Full-time",
+    "fulltime": "Full-time",
+    "part-time": "Part-time",
+    "part time": "Part-time",
+    "parttime": "Part-time",
+    "contract": "Contract",
+    "contractor": "Contract",
+}
+JOB_TYPE_KEYS = frozenset(JOB_TYPE_MAP)
+
+
+def detect_job_type(tags: List[str]) -> Optional[str]:
+    hits = {t.lower() for t in tags} & JOB_TYPE_KEYS
+    if not hits:
+        return None
+    return next(v for k, v in JOB_TYPE_MAP.items() if k in hits)
+
+
 # ================== SELENIUM ==================
-def create_driver():
+_CHROMEDRIVER_LOCK = threading.Lock()
+CHROMEDRIVER_CACHE = Path.home() / ".cache" / "remoteok" / "chromedriver"
+
+
+def chromedriver_path() -> str:
+    """
+    CHROMEDRIVER_PATH (.env) -> ~/.cache/remoteok/chromedriver dagi saqlangan yo'l -> webdriver-manager.
+    webdriver-manager (network + disk tekshiruv) faqat cache bo'lmasa yoki --update berilsa ishlaydi.
+    """
+    env_path = os.getenv("CHROMEDRIVER_PATH")
+    if env_path:
+        return env_path
+
+    # worker'lar bir vaqtda install qilmasin; natija process davomida xotirada
+    with _CHROMEDRIVER_LOCK:
+        return _resolve_chromedriver_path()
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_chromedriver_path() -> str:
+    force_update = "--update" in sys.argv[1:]
+    if not force_update and CHROMEDRIVER_CACHE.exists():
+        cached = CHROMEDRIVER_CACHE.read_text(encoding="utf-8").strip()
+        if cached and Path(cached).exists():
+            return cached
+
+    path = ChromeDriverManager().install()
+    CHROMEDRIVER_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    CHROMEDRIVER_CACHE.write_text(path, encoding="utf-8")
+    return path
+
+
+def create_driver(worker_id: int = 0):
     opts = webdriver.ChromeOptions()
     if HEADLESS:
         opts.add_argument("--headless=new")
-        opts.add_argument("--window-size=1920,1080")
-    else:
-        opts.add_argument("--start-maximized")
+
+    # window size
+    try:
+        width, height = [x.strip() for x in CHROME_WINDOW_SIZE.split(",")]
+    except Exception:
+        width, height = "1920", "1080"
+    opts.add_argument(f"--window-size={width},{height}")
 
     opts.add_argument("--disable-blink-features=AutomationControlled")
     opts.add_argument("--no-sandbox")
     opts.add_argument("--disable-dev-shm-usage")
 
-    return webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
+    # ✅ persistent profile (DNS/HSTS/cache keyingi run'da qayta ishlatiladi)
+    # bitta profilni ikki Chrome bir vaqtda ochololmaydi -> worker bo'yicha alohida
+    if USE_CHROME_PROFILE:
+        profile_dir = CHROME_PROFILE_DIR / f"worker-{worker_id}"
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        opts.add_argument(f"--user-data-dir={profile_dir}")
+
+    # rasm/css/font kerak emas — faqat matn o'qiymiz
+    prefs = {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+    }
+    opts.add_experimental_option("prefs", prefs)
+    opts.add_argument("--blink-settings=imagesEnabled=false")
+
+    driver = webdriver.Chrome(
+        service=Service(chromedriver_path()),
         options=opts,
     )
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd(
+            "Network.setBlockedURLs",
+            {
+                "urls": [
+                    "*.png",
+                    "*.jpg",
+                    "*.jpeg",
+                    "*.gif",
+                    "*.webp",
+                    "*.svg",
+                    "*.ico",
+                    "*.css",
+                    "*.woff",
+                    "*.woff2",
+                    "*.ttf",
+                    "*doubleclick.net*",
+                    "*googletagmanager.com*",
+                    "*google-analytics*",
+                ]
+            },
+        )
+    except Exception:
+        pass
+
+    return driver
 
 
-def wait_ready(driver, timeout=30):
-    WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
+def wait_ready(driver):
+    WebDriverWait(driver, PAGE_LOAD_TIMEOUT).until(
+        lambda d: d.execute_script("return document.readyState") == "complete"
+    )
 
 
-def safe_text(el) -> str:
+def scroll_and_wait_more(driver) -> bool:
+    """
+    Pastga scroll qiladi va tr.job soni oshishini kutadi (poll 0.1s, ko'pi bilan SCROLL_TIMEOUT).
+    Fixed sleep o'rniga: yangi row'lar tez kelsa darhol davom etamiz.
+    """
+    last_count = driver.execute_script(
+        "const n = document.querySelectorAll('tr.job').length;"
+        "window.scrollTo(0, document.body.scrollHeight);"
+        "return n;"
+    )
     try:
-        return (el.text or "").strip()
-    except Exception:
-        return ""
+        WebDriverWait(driver, SCROLL_TIMEOUT, poll_frequency=0.1).until(
+            lambda d: d.execute_script("return document.querySelectorAll('tr.job').length") > last_count
+        )
+        return True
+    except TimeoutException:
+        return False
 
 
 # ================== POSTED TIME PARSER ==================
@@ -479,194 +803,449 @@ def parse_relative_age(age_text: str) -> Optional[datetime.datetime]:
     return None
 
 
-def extract_posted_at_from_tr(tr) -> Optional[datetime.datetime]:
-    selectors = ["td.time", ".time", "time"]
+def extract_posted_at(ages: List[str], dt_raw: Optional[str]) -> Optional[datetime.datetime]:
+    # ages: "td.time", ".time", "time" selector'lari matni (shu tartibda)
+    for age in ages:
+        dt = parse_relative_age(age)
+        if dt:
+            return dt
 
-    for sel in selectors:
+    if dt_raw:
         try:
-            el = tr.find_element(By.CSS_SELECTOR, sel)
-            txt = safe_text(el)
-            dt = parse_relative_age(txt)
-            if dt:
-                return dt
+            dt_raw = dt_raw.replace("Z", "+00:00")
+            return datetime.datetime.fromisoformat(dt_raw).replace(tzinfo=None)
         except Exception:
-            continue
-
-    try:
-        t_el = tr.find_element(By.CSS_SELECTOR, "time[datetime]")
-        dt_raw = t_el.get_attribute("datetime")
-        if dt_raw:
-            try:
-                dt_raw = dt_raw.replace("Z", "+00:00")
-                return datetime.datetime.fromisoformat(dt_raw).replace(tzinfo=None)
-            except Exception:
-                pass
-    except Exception:
-        pass
+            pass
 
     return None
 
 
 # ================== ROW EXTRACTION ==================
-def extract_rows(driver, page: int, job_subtitle: str) -> List[Tuple]:
+# tr.job larni brauzerning o'zida o'qiydi -> sahifa uchun bitta execute_script.
+# (har element/atribut uchun alohida WebDriver/CDP so'rovi yo'q)
+# arguments[0] = offset: scroll faqat pastga row qo'shadi -> oldingi row'lar qayta o'qilmaydi
+JS_EXTRACT_ROWS = r"""
+const txt = (el) => el ? (el.textContent || "").replace(/\s+/g, " ").trim() : "";
+const trs = Array.from(document.querySelectorAll("tr.job"));
+const rows = trs.slice(arguments[0] || 0).map((tr) => {
+  const a = tr.querySelector("a[href*='/remote-jobs/']");
+  const t = tr.querySelector("time[datetime]");
+  return {
+    id: tr.dataset.id || "",
+    title: txt(tr.querySelector("h2")),
+    company: txt(tr.querySelector("h3")),
+    loc: txt(tr.querySelector(".location")),
+    sal: txt(tr.querySelector(".salary")),
+    tags: Array.from(tr.querySelectorAll(".tags a, .tags span")).map(txt),
+    link: a ? a.getAttribute("href") : null,
+    ages: ["td.time", ".time", "time"].map((sel) => txt(tr.querySelector(sel))),
+    dt: t ? t.getAttribute("datetime") : null,
+  };
+});
+return {total: trs.length, rows: rows};
+"""
+
+
+def build_row(
+        job_id: str,
+        title: Optional[str],
+        company: Optional[str],
+        loc: Optional[str],
+        raw_salary: Optional[str],
+        tags: List[str],
+        href: Optional[str],
+        posted_at: Optional[datetime.datetime],
+        page: int,
+        job_subtitle: Optional[str],
+) -> Tuple:
     """
-    Rows tuple (16 values):
+    Rows tuple (16 DB values, ROW_COLUMNS tartibida):
       (job_id, source, title, company, loc, country, country_code, sal,
        job_type, skills, edu, link, page, posted_at, posted_date, job_subtitle)
     """
+    loc = loc or None
+
+    # ✅ country + country_code
+    country, country_code = extract_country_name_and_code(loc)
+
+    sal = normalize_salary_k_range(raw_salary or None)
+
+    skills_list = [x for x in tags if x]
+    skills = ", ".join(skills_list) if skills_list else None
+
+    job_type = detect_job_type(skills_list)
+
+    link = urljoin(REMOTEOK_URL, href) if href else None
+    posted_date = posted_at.date() if posted_at else None
+
+    return (
+        job_id,
+        SOURCE_NAME,
+        title or None,
+        company or None,
+        loc,
+        country,
+        country_code,
+        sal,
+        job_type,
+        skills,
+        None,   # education
+        link,
+        page,
+        posted_at,
+        posted_date,
+        job_subtitle,
+    )
+
+
+def extract_rows(
+        driver,
+        page: int,
+        job_subtitle: Optional[str],
+        known_ids: FrozenSet[str] = frozenset(),
+        offset: int = 0,
+) -> Tuple[List[Tuple], int]:
+    """
+    Sahifadagi offset'dan keyingi tr.job lar -> build_row() tuple'lari.
+    known_ids dagi job'lar location/salary parse'igacha tashlab yuboriladi.
+    Qaytaradi: (rows, DOM dagi jami tr.job soni).
+    """
+    res = driver.execute_script(JS_EXTRACT_ROWS, offset) or {}
+
     rows = []
-    trs = driver.find_elements(By.CSS_SELECTOR, "tr.job")
-    for tr in trs:
+    for item in res.get("rows") or []:
         try:
-            rid = tr.get_attribute("data-id")
+            rid = item.get("id")
             if not rid:
                 continue
 
             job_id = f"remoteok_{rid}"
+            if job_id in known_ids:
+                continue
+
+            rows.append(
+                build_row(
+                    job_id,
+                    title=item.get("title"),
+                    company=item.get("company"),
+                    loc=item.get("loc"),
+                    raw_salary=item.get("sal"),
+                    tags=item.get("tags") or [],
+                    href=item.get("link"),
+                    posted_at=extract_posted_at(item.get("ages") or [], item.get("dt")),
+                    page=page,
+                    job_subtitle=job_subtitle,
+                )
+            )
+        except Exception:
+            continue
 
-            title = None
-            company = None
+    return rows, int(res.get("total") or 0)
 
-            try:
-                title = safe_text(tr.find_element(By.CSS_SELECTOR, "h2")) or None
-            except Exception:
-                pass
-            try:
-                company = safe_text(tr.find_element(By.CSS_SELECTOR, "h3")) or None
-            except Exception:
-                pass
-
-            loc = None
-            loc_els = tr.find_elements(By.CSS_SELECTOR, ".location")
-            if loc_els:
-                loc = safe_text(loc_els[0]) or None
-
-            # ✅ country + country_code
-            country, country_code = extract_country_name_and_code(loc)
-
-            sal = None
-            sal_els = tr.find_elements(By.CSS_SELECTOR, ".salary")
-            if sal_els:
-                sal = safe_text(sal_els[0]) or None
-            sal = normalize_salary_k_range(sal)
-
-            tags = tr.find_elements(By.CSS_SELECTOR, ".tags a, .tags span")
-            skills_list = [safe_text(t) for t in tags]
-            skills_list = [x for x in skills_list if x]
-            skills = ", ".join(skills_list) if skills_list else None
-
-            job_type = None
-            if skills:
-                s = skills.lower()
-                if "full" in s:
-                    job_type = "Full-time"
-                elif "part" in s:
-                    job_type = "Part-time"
-                elif "contract" in s:
-                    job_type = "Contract"
-
-            link = None
-            a_els = tr.find_elements(By.CSS_SELECTOR, "a[href*='/remote-jobs/']")
-            if a_els:
-                link = a_els[0].get_attribute("href") or None
-
-            posted_at = extract_posted_at_from_tr(tr)
-            posted_date = posted_at.date() if posted_at else None
+
+# ================== JSON API ==================
+def api_salary(job: Dict) -> Optional[str]:
+    # API salary_min/salary_max USD da int (yo'q bo'lsa 0) -> DOM dagi "$40k - $120k" formatiga
+    lo, hi = job.get("salary_min") or 0, job.get("salary_max") or 0
+    nums = [f"${n}" for n in (lo, hi) if n]
+    return " - ".join(nums) or None
+
+
+def api_posted_at(job: Dict) -> Optional[datetime.datetime]:
+    epoch = job.get("epoch")
+    if epoch:
+        try:
+            return datetime.datetime.fromtimestamp(int(epoch))
+        except Exception:
+            pass
+    return extract_posted_at([], job.get("date"))
+
+
+def fetch_api_jobs() -> List[Dict]:
+    r = requests.get(REMOTEOK_API_URL, headers={"User-Agent": API_USER_AGENT}, timeout=API_TIMEOUT)
+    r.raise_for_status()
+    data = r.json()
+    # birinchi element — legal/terms obyekt, job emas
+    return [j for j in data if isinstance(j, dict) and j.get("id") and j.get("position")]
+
+
+def api_rows(jobs: List[Dict], known_ids: FrozenSet[str] = frozenset()) -> List[Tuple]:
+    rows = []
+    for job in jobs:
+        try:
+            job_id = f"remoteok_{job['id']}"
+            if job_id in known_ids:
+                continue
 
             rows.append(
-                (
+                build_row(
                     job_id,
-                    SOURCE_NAME,
-                    title,
-                    company,
-                    loc,
-                    country,
-                    country_code,
-                    sal,
-                    job_type,
-                    skills,
-                    None,   # education
-                    link,
-                    page,
-                    posted_at,
-                    posted_date,
-                    job_subtitle,
+                    title=job.get("position"),
+                    company=job.get("company"),
+                    loc=job.get("location"),
+                    raw_salary=api_salary(job),
+                    tags=[str(t) for t in (job.get("tags") or [])],
+                    href=job.get("url"),
+                    posted_at=api_posted_at(job),
+                    page=1,
+                    job_subtitle=None,
                 )
             )
         except Exception:
             continue
-
     return rows
 
 
-# ================== SCROLL & INSERT PER KEYWORD ==================
-def collect_for_keyword(driver, conn, keyword: str) -> None:
-    seen: Set[str] = set()
+# ================== SCROLL ==================
+# global_seen_ids worker'lar orasida umumiy -> faqat shu lock ostida o'zgartiriladi
+_SEEN_LOCK = threading.Lock()
+
+
+def scroll_collect(
+        driver,
+        job_subtitle: Optional[str],
+        global_seen_ids: Set[str],
+        known_ids: FrozenSet[str] = frozenset(),
+) -> List[Tuple]:
+    """
+    Ochiq sahifani scroll qilib, yangi (takrorlanmagan) row'larni yig'adi.
+    job_subtitle: keyword rejimida keyword, feed rejimida None.
+    global_seen_ids: boshqa keyword'larda allaqachon yig'ilgan job_id'lar.
+    known_ids: run boshida DB dan yuklangan job_id'lar (extract paytida tashlanadi).
+    """
+    label = job_subtitle or "feed"
+    collected: List[Tuple] = []
+    offset = 0
     no_new = 0
-    total_unique = 0
-    total_upserted = 0
 
-    for page in range(1, MAX_SCROLLS_PER_KEYWORD + 1):
-        base_rows = extract_rows(driver, page, job_subtitle=keyword)
+    for page in range(1, MAX_SCROLLS + 1):
+        base_rows, total = extract_rows(
+            driver, page, job_subtitle=job_subtitle, known_ids=known_ids, offset=offset
+        )
 
-        fresh = []
-        for r in base_rows:
-            if r[0] not in seen:
-                seen.add(r[0])
-                fresh.append(r)
+        # stop sharti DOM ga qo'shilgan row'lar soni bo'yicha (known/boshqa keyword ko'rganlari ham hisob)
+        new_count = max(0, total - offset)
+        offset = max(offset, total)
 
-        new_count = len(fresh)
-        total_unique += new_count
-        print(f"[SCROLL] kw='{keyword}' page={page} total_unique={total_unique} new={new_count}")
+        # per-row `in` tekshiruvlar o'rniga bitta set-difference (C darajada)
+        with _SEEN_LOCK:
+            new_ids = {r[0] for r in base_rows} - global_seen_ids
+            global_seen_ids |= new_ids
+
+        collected.extend(r for r in base_rows if r[0] in new_ids)
+
+        print(f"[SCROLL] kw='{label}' page={page} total_unique={len(collected)} new={new_count} kept={len(new_ids)}")
 
         if new_count == 0:
             no_new += 1
         else:
             no_new = 0
 
-        if fresh:
-            up = insert_rows(conn, fresh)
-            total_upserted += up
-            print(f"[DB] kw='{keyword}' upserted={up} total_upserted={total_upserted}")
-
         if no_new >= NO_NEW_LIMIT:
-            print(f"[STOP] kw='{keyword}' no_new_limit reached ({NO_NEW_LIMIT})")
+            print(f"[STOP] kw='{label}' no_new_limit reached ({NO_NEW_LIMIT})")
             break
 
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(SCROLL_PAUSE)
+        # SCROLL_TIMEOUT ichida DOM o'smadi -> keyingi extract ham new=0 beradi; limit'ga yetsa extract'siz chiqamiz
+        if not scroll_and_wait_more(driver) and no_new + 1 >= NO_NEW_LIMIT:
+            print(f"[STOP] kw='{label}' no new rows after scroll, no_new_limit reached ({NO_NEW_LIMIT})")
+            break
+
+    print(f"[DONE] kw='{label}' total_unique={len(collected)}")
+    return collected
+
+
+def scrape_keyword(
+        driver,
+        keyword: str,
+        global_seen_ids: Set[str],
+        known_ids: FrozenSet[str] = frozenset(),
+) -> List[Tuple]:
+    url = keyword_to_remoteok_url(keyword)
+    print(f"\n[SEARCH] keyword='{keyword}' -> {url}")
+
+    driver.get(url)
+    wait_ready(driver)
+
+    return scroll_collect(driver, job_subtitle=keyword, global_seen_ids=global_seen_ids, known_ids=known_ids)
 
-    print(f"[DONE] kw='{keyword}' total_unique={total_unique} total_upserted={total_upserted}")
+
+def scrape_feed(
+        driver,
+        keywords: List[str],
+        global_seen_ids: Set[str],
+        known_ids: FrozenSet[str] = frozenset(),
+) -> List[Tuple]:
+    driver.get(REMOTEOK_URL)
+    wait_ready(driver)
+
+    rows = scroll_collect(driver, job_subtitle=None, global_seen_ids=global_seen_ids, known_ids=known_ids)
+
+    matcher = build_keyword_matcher(keyword_tokens(keywords))
+    matched = [r for r in rows if match_keywords(row_hay(r), matcher)]
+    print(f"[FILTER] total_unique={len(rows)} matched={len(matched)}")
+    return matched
+
+
+# ================== WORKERS ==================
+def keyword_worker(
+        worker_id: int,
+        kw_queue: "queue.Queue[str]",
+        row_queue: "queue.Queue",
+        global_seen_ids: Set[str],
+        known_ids: FrozenSet[str],
+) -> None:
+    driver = create_driver(worker_id)
+    try:
+        driver.get(REMOTEOK_URL)
+        wait_ready(driver)
+
+        while True:
+            try:
+                kw = kw_queue.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                rows = scrape_keyword(driver, kw, global_seen_ids, known_ids)
+            except Exception as e:
+                print(f"[ERR] worker={worker_id} kw='{kw}' -> {type(e).__name__}: {e}")
+                continue
+
+            if rows:
+                row_queue.put(rows)
+    finally:
+        driver.quit()
+
+
+def db_writer(conn, row_queue: "queue.Queue") -> int:
+    """
+    Yagona DB writer: worker'lardan kelgan row'larni DB_WRITE_BATCH bo'yicha
+    staging'ga COPY qiladi. None kelganda hammasini bitta INSERT ... SELECT
+    bilan public.remoteok ga o'tkazib, bitta commit qiladi.
+    """
+    buf: List[Tuple] = []
+    total_staged = 0
+
+    try:
+        with conn.cursor() as cur:
+            ensure_stage_table(cur)
+
+            while True:
+                rows = row_queue.get()
+                if rows is None:
+                    break
+
+                buf.extend(rows)
+                if len(buf) >= DB_WRITE_BATCH:
+                    total_staged += stage_rows(cur, buf)
+                    print(f"[DB] staged={len(buf)} total_staged={total_staged}")
+                    buf = []
+
+            total_staged += stage_rows(cur, buf)
+            inserted, updated = upsert_from_stage(cur)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    print(f"[DB] total_staged={total_staged} inserted={inserted} updated={updated}")
+    return inserted
+
+
+def run_keywords(conn, keywords: List[str], known_ids: FrozenSet[str]) -> int:
+    kw_queue: "queue.Queue[str]" = queue.Queue()
+    for kw in keywords:
+        kw_queue.put(kw)
+    row_queue: "queue.Queue" = queue.Queue()
+    global_seen_ids: Set[str] = set()
+
+    workers = max(1, min(MAX_WORKERS, len(keywords)))
+
+    with ThreadPoolExecutor(max_workers=workers + 1) as ex:
+        writer = ex.submit(db_writer, conn, row_queue)
+        futures = []
+        try:
+            futures = [
+                ex.submit(keyword_worker, i, kw_queue, row_queue, global_seen_ids, known_ids)
+                for i in range(workers)
+            ]
+            # sentinel faqat BARCHA worker'lar tugagandan keyin: bittasi yiqilsa ham
+            # qolganlari hali row_queue ga yozayotgan bo'lishi mumkin
+            wait(futures)
+        finally:
+            row_queue.put(None)
+
+        inserted = writer.result()
+        for f in futures:
+            f.result()
+        return inserted
+
+
+def run_feed(conn, keywords: List[str], known_ids: FrozenSet[str]) -> int:
+    row_queue: "queue.Queue" = queue.Queue()
+
+    driver = create_driver()
+    try:
+        row_queue.put(scrape_feed(driver, keywords, set(), known_ids))
+    finally:
+        driver.quit()
+
+    row_queue.put(None)
+    return db_writer(conn, row_queue)
+
+
+def run_api(conn, keywords: List[str], known_ids: FrozenSet[str]) -> int:
+    jobs = fetch_api_jobs()
+    rows = api_rows(jobs, known_ids)
+
+    matcher = build_keyword_matcher(keyword_tokens(keywords))
+    matched = [r for r in rows if match_keywords(row_hay(r), matcher)]
+    print(f"[API] jobs={len(jobs)} new={len(rows)} matched={len(matched)}")
+
+    row_queue: "queue.Queue" = queue.Queue()
+    row_queue.put(matched)
+    row_queue.put(None)
+    return db_writer(conn, row_queue)
+
+
+def resolve_mode() -> str:
+    for arg in sys.argv[1:]:
+        if arg.startswith("--mode="):
+            return arg.split("=", 1)[1].strip().lower()
+    return DEFAULT_MODE
 
 
 def main():
+    mode = resolve_mode()
+    if mode not in MODES:
+        raise RuntimeError(f"Noma'lum mode: {mode!r} (mavjud: {', '.join(MODES)})")
+
     keywords = load_keywords()
+    print(f"[MODE] {mode}")
     print(f"[KEYWORDS] {len(keywords)} -> {keywords}")
+    if mode == "keyword" and not keywords:
+        return
 
     conn = open_db()
-    driver = None
     try:
         ensure_table_exists(conn)
-        driver = create_driver()
-
-        driver.get(REMOTEOK_URL)
-        wait_ready(driver)
 
-        for kw in keywords:
-            url = keyword_to_remoteok_url(kw)
-            print(f"\n[SEARCH] keyword='{kw}' -> {url}")
+        known_ids: FrozenSet[str] = frozenset()
+        if REMOTEOK_SKIP_KNOWN:
+            known_ids = load_known_ids(conn)
+            print(f"[DB] known job_ids={len(known_ids)}")
 
-            driver.get(url)
-            wait_ready(driver)
+        if mode == "api":
+            total_inserted = run_api(conn, keywords, known_ids)
+        elif mode == "feed":
+            total_inserted = run_feed(conn, keywords, known_ids)
+        else:
+            total_inserted = run_keywords(conn, keywords, known_ids)
 
-            collect_for_keyword(driver, conn, kw)
+        print(f"\n[DONE] mode={mode} keywords={len(keywords)} total_inserted={total_inserted}")
 
     finally:
-        try:
-            if driver:
-                driver.quit()
-        finally:
-            conn.close()
+        conn.close()
 
 
 if __name__ == "__main__":
@@ -675,4 +1254,9 @@ if __name__ == "__main__":
 
 """
 pip install geonamescache pycountry
+
+python remoteok_main.py                 # api rejimi (default, Chrome'siz)
+python remoteok_main.py --mode=keyword  # har keyword sahifasi (Selenium)
+python remoteok_main.py --mode=feed     # bosh sahifa + keyword filter (Selenium)
+python remoteok_main.py --update        # chromedriver'ni qayta yuklab olish
 """
@@ -0,0 +1,82 @@
+import pytest
+
+for _mod in ("psycopg2", "requests", "dotenv", "selenium", "webdriver_manager", "geonamescache", "pycountry"):
+    pytest.importorskip(_mod)
+
+import remoteok_main as ro  # noqa: E402
+
+
+def matcher_for(keywords):
+    return ro.build_keyword_matcher(ro.keyword_tokens(keywords))
+
+
+# ================== match_keywords ==================
+def test_match_keywords_empty_list_matches_everything():
+    assert ro.build_keyword_matcher(ro.keyword_tokens([])) is None
+    assert ro.match_keywords("", None) is True
+    assert ro.match_keywords("anything", None) is True
+
+
+def test_match_keywords_empty_hay():
+    assert ro.match_keywords("", matcher_for(["python"])) is False
+
+
+@pytest.mark.parametrize(
+    "keywords, hay, matched",
+    [
+        (["Python Developer"], "senior python engineer", True),
+        (["Python Developer"], "frontend developer", True),
+        (["Python"], "golang engineer", False),
+        # substring match (eski `t in hay` kabi)
+        (["java"], "javascript engineer", True),
+        (["JavaScript"], "java engineer", False),
+        # normalize: belgilar probelga, kichik harf
+        (["C#/.NET"], "net engineer", True),
+        # 1 harfli token'lar tashlanadi
+        (["C"], "c engineer", None),
+    ],
+)
+def test_match_keywords(keywords, hay, matched):
+    matcher = matcher_for(keywords)
+    if matched is None:
+        assert matcher is None
+    else:
+        assert ro.match_keywords(hay, matcher) is matched
+
+
+def test_row_hay_uses_title_company_location_skills():
+    row = ro.build_row(
+        "remoteok_1",
+        title="Senior Python Dev",
+        company="Acme, Inc.",
+        loc=None,
+        raw_salary=None,
+        tags=["AWS", "Docker"],
+        href=None,
+        posted_at=None,
+        page=1,
+        job_subtitle=None,
+    )
+    assert len(row) == len(ro.ROW_COLUMNS)
+    assert ro.row_hay(row) == "senior python dev acme inc aws docker"
+
+
+# ================== detect_job_type ==================
+@pytest.mark.parametrize(
+    "tags, job_type",
+    [
+        ([], None),
+        (["python", "aws"], None),
+        (["Full-Time"], "Full-time"),
+        (["fulltime"], "Full-time"),
+        (["part time"], "Part-time"),
+        (["contractor"], "Contract"),
+        # bir nechta bo'lsa JOB_TYPE_MAP tartibi ustun (tag tartibi emas)
+        (["contract", "part-time"], "Part-time"),
+        (["contract", "part-time", "full-time"], "Full-time"),
+        # butun tag bo'yicha, substring emas
+        (["fullstack"], None),
+    ],
+)
+def test_detect_job_type(tags, job_type):
+    assert ro.detect_job_type(tags) == job_type
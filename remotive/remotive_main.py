@@ -1,14 +1,16 @@
 import datetime as dt
 import json
 import os
-import time
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import pyodbc
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # =========================
 # LOAD .env
@@ -17,6 +19,14 @@ BASE_DIR = Path(__file__).resolve().parents[1]  # Itic_Jobs
 load_dotenv(BASE_DIR / ".env")
 
 REMOTIVE_ENDPOINT = "https://remotive.com/api/remote-jobs"
+# API so'rovlari parallel (I/O bound) -> thread'lar yetarli; API rate-limit qiladi -> kam ushlab turing
+REMOTIVE_WORKERS = max(1, int(os.getenv("REMOTIVE_WORKERS", "2")))
+# 429/5xx/ulanish xatolarida qayta urinish (exponential backoff, Retry-After hurmat qilinadi)
+REMOTIVE_RETRIES = int(os.getenv("REMOTIVE_RETRIES", "5"))
+REMOTIVE_BACKOFF = float(os.getenv("REMOTIVE_BACKOFF", "1.0"))
+
+_HTML_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
 
 
 # =========================
@@ -51,7 +61,7 @@ def open_db() -> pyodbc.Connection:
     return conn
 
 
-def ensure_table_exists(conn: pyodbc.Connection) -> None:
+def ensure_table_exists(cur: pyodbc.Cursor) -> None:
     sql = """
     IF OBJECT_ID('dbo.remotive', 'U') IS NULL
     BEGIN
@@ -73,8 +83,8 @@ def ensure_table_exists(conn: pyodbc.Connection) -> None:
         );
     END
     """
-    conn.cursor().execute(sql)
-    conn.commit()
+    cur.execute(sql)
+    cur.connection.commit()
 
 
 def safe_text(x: Any, max_len: Optional[int] = None) -> Optional[str]:
@@ -117,15 +127,55 @@ def load_job_list(path: str = "job_list.json") -> List[str]:
 # =========================
 # REMOTIVE API
 # =========================
-def remotive_search(keyword: str, timeout: int = 30) -> List[Dict[str, Any]]:
+def make_session() -> requests.Session:
+    # keep-alive; pool worker'lar soniga teng, aks holda urllib3 "pool is full" deb ulanishni tashlaydi
+    session = requests.Session()
+    retry = Retry(
+        total=REMOTIVE_RETRIES,
+        backoff_factor=REMOTIVE_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=REMOTIVE_WORKERS, max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+_SESSION = make_session()
+
+
+def remotive_search(
+        keyword: str,
+        session: requests.Session = _SESSION,
+        timeout: int = 30,
+) -> List[Dict[str, Any]]:
     params = {"search": keyword}
-    r = requests.get(REMOTIVE_ENDPOINT, params=params, timeout=timeout)
+    r = session.get(REMOTIVE_ENDPOINT, params=params, timeout=timeout)
     r.raise_for_status()
     data = r.json()
     jobs = data.get("jobs") or []
     return jobs if isinstance(jobs, list) else []
 
 
+def fetch_all(keywords: List[str]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Barcha keyword'lar uchun API so'rovlari parallel: (keyword, jobs) ro'yxati, keyword tartibida.
+    Xato bergan keyword log qilinadi va (keyword, []) bilan o'tkazib yuboriladi.
+    """
+    with ThreadPoolExecutor(max_workers=REMOTIVE_WORKERS) as ex:
+        return list(ex.map(_search_or_empty, keywords))
+
+
+def _search_or_empty(kw: str) -> Tuple[str, List[Dict[str, Any]]]:
+    # retry'lar tugagandan keyin ham xato bo'lsa: bitta keyword butun run'ni to'xtatmasin
+    try:
+        return kw, remotive_search(kw, _SESSION)
+    except Exception as e:
+        print(f"[ERROR] keyword='{kw}' -> {type(e).__name__}: {e}")
+        return kw, []
+
+
 def parse_posted_date(x: Optional[str]) -> dt.date:
     if not x:
         return dt.date.today()
@@ -142,8 +192,8 @@ def strip_html(html: str) -> str:
     if not html:
         return ""
     # juda oddiy html strip
-    text = re.sub(r"<[^>]+>", " ", html)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _HTML_RE.sub(" ", html)
+    text = _WS_RE.sub(" ", text).strip()
     return text
 
 
@@ -199,88 +249,120 @@ def normalize_remotive_job(job: Dict[str, Any], job_keywords: List[str]) -> Dict
 # =========================
 # SQL SERVER UPSERT -> dbo.remotive
 # =========================
+STAGE_COLUMNS = (
+    "job_id", "job_title", "location", "skills", "salary", "education", "job_type",
+    "company_name", "job_url", "source", "description", "job_subtitle", "posted_date",
+)
+
+# #stage — connection-scoped temp table; run boshida bir marta yaratiladi, bitta batch MERGE'dan keyin TRUNCATE
+STAGE_DDL = """
+IF OBJECT_ID('tempdb..#stage') IS NULL
+CREATE TABLE #stage (
+  job_id NVARCHAR(100) NOT NULL,
+  job_title NVARCHAR(100) NULL,
+  location NVARCHAR(100) NULL,
+  skills NVARCHAR(MAX) NULL,
+  salary NVARCHAR(MAX) NULL,
+  education NVARCHAR(100) NULL,
+  job_type NVARCHAR(50) NULL,
+  company_name NVARCHAR(100) NULL,
+  job_url NVARCHAR(200) NULL,
+  source NVARCHAR(20) NULL,
+  description NVARCHAR(MAX) NULL,
+  job_subtitle NVARCHAR(250) NULL,
+  posted_date DATE NOT NULL
+);
+"""
+
+STAGE_INSERT_SQL = f"""
+INSERT INTO #stage ({", ".join(STAGE_COLUMNS)})
+VALUES ({", ".join("?" for _ in STAGE_COLUMNS)});
+"""
+
 MERGE_SQL = """
 MERGE dbo.remotive AS target
-USING (SELECT ? AS job_id) AS src
+USING #stage AS src
 ON target.job_id = src.job_id
 WHEN MATCHED THEN
   UPDATE SET
-    job_title = ?,
-    location = ?,
-    skills = ?,
-    salary = ?,
-    education = ?,
-    job_type = ?,
-    company_name = ?,
-    job_url = ?,
-    source = ?,
-    description = ?,
-    job_subtitle = ?,
-    posted_date = ?
+    job_title = src.job_title,
+    location = src.location,
+    skills = src.skills,
+    salary = src.salary,
+    education = src.education,
+    job_type = src.job_type,
+    company_name = src.company_name,
+    job_url = src.job_url,
+    source = src.source,
+    description = src.description,
+    job_subtitle = src.job_subtitle,
+    posted_date = src.posted_date
 WHEN NOT MATCHED THEN
   INSERT (
     job_id, job_title, location, skills, salary, education, job_type,
     company_name, job_url, source, description, job_subtitle, posted_date
   )
-  VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+  VALUES (
+    src.job_id, src.job_title, src.location, src.skills, src.salary, src.education, src.job_type,
+    src.company_name, src.job_url, src.source, src.description, src.job_subtitle, src.posted_date
+  );
 """
 
 
-def upsert(conn: pyodbc.Connection, row: Dict[str, Any]) -> None:
-    if not row.get("job_id"):
-        return
-
-    params_once = (
-        row["job_id"],
-        row["job_title"],
-        row["location"],
-        row["skills"],
-        row["salary"],
-        row["education"],
-        row["job_type"],
-        row["company_name"],
-        row["job_url"],
-        row["source"],
-        row["description"],
-        row["job_subtitle"],
-        row["posted_date"],
-    )
+def ensure_stage_table(cur: pyodbc.Cursor) -> None:
+    cur.execute(STAGE_DDL)
 
-    cur = conn.cursor()
-    cur.execute(MERGE_SQL, params_once + params_once)
+
+def upsert_batch(cur: pyodbc.Cursor, rows: List[Dict[str, Any]]) -> int:
+    """
+    Row'larni fast_executemany bilan #stage ga, keyin bitta MERGE bilan dbo.remotive ga yozadi.
+    cur.fast_executemany = True bo'lishi kerak (run() da bir marta qo'yiladi).
+    """
+    # MERGE source'da bir xil job_id 2 marta bo'lsa xato beradi -> oxirgisi qoladi
+    by_id: Dict[str, Tuple] = {}
+    for row in rows:
+        if row.get("job_id"):
+            by_id[row["job_id"]] = tuple(row[c] for c in STAGE_COLUMNS)
+
+    if not by_id:
+        return 0
+
+    cur.executemany(STAGE_INSERT_SQL, list(by_id.values()))
+    cur.execute(MERGE_SQL)
+    cur.execute("TRUNCATE TABLE #stage;")
+    return len(by_id)
 
 
 # =========================
 # RUNNER
 # =========================
-def run(sleep_sec: float = 0.6) -> Tuple[int, int]:
+def run() -> Tuple[int, int]:
     keywords = load_job_list("job_list.json")
-    conn = open_db()
-    ensure_table_exists(conn)
 
-    total_seen = 0
-    total_upserted = 0
+    # API'dan barcha keyword'larni parallel olamiz, DB ga oxirida bitta batch
+    results = fetch_all(keywords)
 
-    try:
-        for kw in keywords:
-            print(f"\n=== KEYWORD: {kw} ===")
-            jobs = remotive_search(kw)
+    rows: List[Dict[str, Any]] = []
+    for kw, jobs in results:
+        print(f"[RESULTS] keyword='{kw}' -> {len(jobs)}")
+        rows.extend(normalize_remotive_job(j, keywords) for j in jobs)
 
-            print(f"[RESULTS] {len(jobs)}")
-            for j in jobs:
-                total_seen += 1
-                row = normalize_remotive_job(j, keywords)
-                upsert(conn, row)
-                total_upserted += 1
+    total_seen = len(rows)
 
-            conn.commit()
+    conn = open_db()
+    # bitta cursor butun run uchun: DDL, #stage, MERGE, COUNT
+    cur = conn.cursor()
+    cur.fast_executemany = True
+    try:
+        ensure_table_exists(cur)
+        ensure_stage_table(cur)
 
-            # DB count ko'rsatib turamiz (real tushyaptimi yo'qmi)
-            c = conn.cursor()
-            c.execute("SELECT COUNT(1) FROM dbo.remotive")
-            print("[DB COUNT]", c.fetchone()[0])
+        total_upserted = upsert_batch(cur, rows)
+        conn.commit()
 
-            time.sleep(sleep_sec)
+        # DB count ko'rsatib turamiz (real tushyaptimi yo'qmi)
+        cur.execute("SELECT COUNT(1) FROM dbo.remotive")
+        print("[DB COUNT]", cur.fetchone()[0])
 
         print(f"\n[DONE] total_seen={total_seen} upserted={total_upserted}")
         return total_seen, total_upserted
@@ -289,8 +371,9 @@ def run(sleep_sec: float = 0.6) -> Tuple[int, int]:
         conn.rollback()
         raise
     finally:
+        cur.close()
         conn.close()
 
 
 if __name__ == "__main__":
-    run(sleep_sec=0.6)
+    run()
@@ -0,0 +1,47 @@
+import pytest
+
+for _mod in ("pyodbc", "requests", "dotenv", "urllib3"):
+    pytest.importorskip(_mod)
+
+from remotive import remotive_main as rm  # noqa: E402
+
+
+class RecordingCursor:
+    """upsert_batch chaqiradigan execute/executemany'larni yozib boradi (DB'siz)."""
+
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, sql, *params):
+        self.calls.append(("execute", sql, params))
+
+    def executemany(self, sql, seq):
+        self.calls.append(("executemany", sql, list(seq)))
+
+
+def row(job_id, title="Dev"):
+    r = dict.fromkeys(rm.STAGE_COLUMNS)
+    r.update(job_id=job_id, job_title=title)
+    return r
+
+
+def test_upsert_batch_empty():
+    cur = RecordingCursor()
+    assert rm.upsert_batch(cur, []) == 0
+    assert rm.upsert_batch(cur, [row(None), row("")]) == 0
+    assert cur.calls == []
+
+
+def test_upsert_batch_dedupes_by_job_id_last_wins():
+    cur = RecordingCursor()
+    n = rm.upsert_batch(cur, [row("1", "old"), row("2"), row(None), row("1", "new")])
+    assert n == 2
+
+    kind, sql, params = cur.calls[0]
+    assert (kind, sql) == ("executemany", rm.STAGE_INSERT_SQL)
+    title_idx = rm.STAGE_COLUMNS.index("job_title")
+    assert [(p[0], p[title_idx]) for p in params] == [("1", "new"), ("2", "Dev")]
+    assert all(len(p) == len(rm.STAGE_COLUMNS) for p in params)
+
+    # keyin bitta MERGE va #stage tozalanadi
+    assert [c[1] for c in cur.calls[1:]] == [rm.MERGE_SQL, "TRUNCATE TABLE #stage;"]
@@ -0,0 +1,190 @@
+import datetime
+
+import pytest
+
+for _mod in ("psycopg2", "requests", "undetected_chromedriver", "bs4", "dotenv", "selenium"):
+    pytest.importorskip(_mod)
+
+import themuse_main as tm  # noqa: E402
+
+
+def fields(text):
+    return tm.parse_detail_fields(tm.normalize_detail_text(text))
+
+
+# ================== parse_detail_fields ==================
+def test_detail_fields_empty():
+    assert fields(None) == (None, None, None)
+    assert fields("") == (None, None, None)
+
+
+@pytest.mark.parametrize(
+    "text, job_type",
+    [
+        ("Full-time position", "Full-time"),
+        ("full time", "Full-time"),
+        # ustuvorlik matndagi tartibga emas, eski if-zanjir tartibiga bog'liq
+        ("Part-time or Full-time", "Full-time"),
+        ("Contract, part time", "Part-time"),
+        ("Internship or contract", "Contract"),
+        ("paid internship", "Internship"),
+        # eski `"intern" in t` kabi — so'z chegarasi yo'q
+        ("international team", "Internship"),
+        ("no type here", None),
+    ],
+)
+def test_detail_fields_job_type(text, job_type):
+    assert fields(text)[1] == job_type
+
+
+@pytest.mark.parametrize(
+    "text, education",
+    [
+        ("PhD or Master's", "PhD"),
+        ("Doctorate", "PhD"),
+        ("MSc preferred", "Master"),
+        ("Bachelor or Master", "Master"),
+        ("Undergraduate degree", "Bachelor"),
+        ("degree required", "Degree required"),
+        ("no education", None),
+    ],
+)
+def test_detail_fields_education(text, education):
+    assert fields(text)[2] == education
+
+
+def test_detail_fields_glued_tokens_all_found():
+    # HTML matn tugunlari probelsiz qo'shilsa ham ikkala token topiladi
+    assert fields("MScContract") == (None, "Contract", "Master")
+    assert fields("PhDegree") == (None, None, "PhD")
+
+
+@pytest.mark.parametrize(
+    "text, salary",
+    [
+        ("Pay: $100,000 - $150,000 per year", "$100,000 - $150,000"),
+        ("£40,000", "£40,000"),
+        ("€ 50-60", "€ 50-60"),
+        # birinchi salary qoladi
+        ("$10 then $20", "$10"),
+        ("no money", None),
+    ],
+)
+def test_detail_fields_salary(text, salary):
+    assert fields(text)[0] == salary
+
+
+def test_detail_fields_whitespace_is_collapsed():
+    # normalize_detail_text: har qanday bo'shliq ketma-ketligi bitta probel
+    assert fields("full\ntime") == (None, "Full-time", None)
+    assert fields("$100  -  $200") == ("$100 - $200", None, None)
+    assert fields("$\t100") == ("$ 100", None, None)
+
+
+# ================== parse_location_from_card_text ==================
+@pytest.mark.parametrize(
+    "card_text, location",
+    [
+        ("Backend Engineer - New York, NY", "New York, NY"),
+        ("Backend Engineer - Remote Posted on Jan 5, 2025", "Remote"),
+        ("Backend Engineer - Remote\nPosted 3 days ago", "Remote"),
+        ("Backend Engineer - Remote posted on jan 5", "Remote"),
+        # faqat birinchi " - " bo'yicha bo'linadi
+        ("Engineer - Data - Berlin", "Data - Berlin"),
+        ("Backend Engineer", None),
+        ("Backend Engineer - Posted on Jan 5", "Posted on Jan 5"),
+        ("Backend Engineer -   ", None),
+    ],
+)
+def test_card_location(card_text, location):
+    assert tm.parse_location_from_card_text(card_text) == location
+
+
+def test_card_location_posted_on_needs_single_space():
+    # eski `\s+Posted on` kabi: "Posted" va "on" orasida qator ko'chishi bo'lsa dum kesilmaydi
+    assert tm.parse_location_from_card_text("Dev - msc posted \n on") == "msc posted \n on"
+    assert tm.parse_location_from_card_text("Dev - NYC Posted  on Jan 5") == "NYC Posted  on Jan 5"
+
+
+# ================== parse_posted_date ==================
+def days_ago(n):
+    return datetime.date.today() - datetime.timedelta(days=n)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Posted on January 23, 2026", datetime.date(2026, 1, 23)),
+        ("posted on Jan 5, 2025", datetime.date(2025, 1, 5)),
+        ("01/23/2026", datetime.date(2026, 1, 23)),
+        # mm/dd bo'lmasa dd/mm
+        ("23/01/2026", datetime.date(2026, 1, 23)),
+        ("23-01-2026", datetime.date(2026, 1, 23)),
+    ],
+)
+def test_posted_date_absolute(text, expected):
+    assert tm.parse_posted_date(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, n",
+    [
+        ("Posted 7h ago", 0),
+        ("48 hours ago", 2),
+        ("2d", 2),
+        ("2 days ago", 2),
+        ("3w", 21),
+        ("1 month ago", 30),
+        ("Today", 0),
+        ("yesterday", 1),
+    ],
+)
+def test_posted_date_relative(text, n):
+    assert tm.parse_posted_date(text) == days_ago(n)
+
+
+def test_posted_date_priority_follows_kind_not_position():
+    # eski if-zanjir tartibi: absolute sana relative'dan ustun, matndagi o'rnidan qat'i nazar
+    assert tm.parse_posted_date("Today · Posted on Jan 5, 2025") == datetime.date(2025, 1, 5)
+    assert tm.parse_posted_date("yesterday, 3 days ago") == days_ago(3)
+
+
+@pytest.mark.parametrize("text", [None, "", "   ", "no date here", "Posted on Foo 5, 2025"])
+def test_posted_date_none(text):
+    assert tm.parse_posted_date(text) is None
+
+
+def test_posted_date_invalid_absolute_falls_through():
+    assert tm.parse_posted_date("Posted on Feb 30, 2025 · 2 days ago") == days_ago(2)
+
+
+# ================== job_id_from_href ==================
+@pytest.mark.parametrize(
+    "href, job_id",
+    [
+        (None, None),
+        ("", None),
+        ("https://www.themuse.com/search/keyword/python", None),
+        ("https://www.themuse.com/search?job=abc-123", "abc-123"),
+        ("https://www.themuse.com/search?page=2&job=abc-123&x=1", "abc-123"),
+        ("/search?job=a%2Fb", "a/b"),
+        # parse_qs + unquote: ikki marta kodlangan ham ochiladi
+        ("/search?job=a%252Fb", "a/b"),
+        ("/search?job=a+b", "a b"),
+        # birinchi bo'sh bo'lmagan qiymat (parse_qs kabi)
+        ("/search?job=a&job=b", "a"),
+        ("/search?job=&job=b", "b"),
+        ("/search?notjob=1&job=2", "2"),
+        # fragment query emas
+        ("/search?x=1#job=abc", None),
+        ("/search?job=abc#frag", "abc"),
+        ("/jobs/job=abc", None),
+    ],
+)
+def test_job_id_from_href(href, job_id):
+    assert tm.job_id_from_href(href) == job_id
+
+
+def test_parse_job_id_from_url_falls_back_to_url():
+    assert tm.parse_job_id_from_url("https://www.themuse.com/jobs/acme/dev") == "https://www.themuse.com/jobs/acme/dev"
+    assert tm.parse_job_id_from_url("https://www.themuse.com/search?job=42") == "42"
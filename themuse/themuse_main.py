@@ -1,21 +1,47 @@
+import csv
 import datetime
+import io
 import json
 import os
+import random
 import re
+import sys
 import time
 import urllib.parse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, FrozenSet, List, Tuple
 
 import psycopg2
+import requests
+from requests.adapters import HTTPAdapter
 import undetected_chromedriver as uc
+from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from psycopg2.extras import execute_values
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+# ixtiyoriy: pip install pyahocorasick (yo'q bo'lsa regex fallback)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# ixtiyoriy: pip install playwright && playwright install chromium (faqat USE_PLAYWRIGHT=true)
+try:
+    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+except ImportError:
+    sync_playwright = None
+    PlaywrightTimeoutError = None
+
+# ixtiyoriy: pip install orjson (yo'q bo'lsa stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 load_dotenv()
 
 # ================== PATH / CONFIG ==================
@@ -28,11 +54,62 @@ BASE_URL = "https://www.themuse.com/search"
 DEFAULT_WAIT = int(os.getenv("SELENIUM_WAIT", "25"))
 HEADLESS = os.getenv("HEADLESS", "false").strip().lower() in ("1", "true", "yes")
 MAX_PAGES = int(os.getenv("MAX_PAGES", "50"))
-PAGE_SLEEP = float(os.getenv("PAGE_SLEEP", "0.6"))
-
-BATCH_SIZE = int(os.getenv("BATCH_SIZE", "20"))
+PAGE_SLEEP = float(os.getenv("PAGE_SLEEP", "0"))   # click'dan keyin ixtiyoriy throttle (sayt rate-limit qilsa); kutish DOM bo'yicha
+
+# keyword buffer'i sahifa oxirida shu songa yetgan bo'lsa yoziladi + commit (sahifa ichida flush yo'q)
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "500"))
+ASYNC_COMMIT = os.getenv("THEMUSE_ASYNC_COMMIT", "true").strip().lower() in ("1", "true", "yes")
+# BATCH_SIZE bo'yicha flush'lar COPY bilan, keyword oxiridagi qoldiq — unnest EXECUTE bilan
+COPY_MIN_ROWS = int(os.getenv("COPY_MIN_ROWS", str(BATCH_SIZE)))
+
+# card href'ida ?job=... bo'lsa detail'ni click qilmasdan HTTP bilan olish (brauzer cookie'lari bilan)
+HTTP_DETAIL = os.getenv("THEMUSE_HTTP_DETAIL", "true").strip().lower() in ("1", "true", "yes")
+HTTP_TIMEOUT = int(os.getenv("THEMUSE_HTTP_TIMEOUT", "20"))
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+FETCH_JITTER = float(os.getenv("FETCH_JITTER", "0.3"))   # har so'rovdan oldin 0..N s (saytni bosmaslik uchun)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+)
 MAX_STALE_RETRY = int(os.getenv("MAX_STALE_RETRY", "3"))
 
+# true -> DB'da bor job_id'lar click/fetch qilinmaydi (tezroq; remoteok'dagi REMOTEOK_SKIP_KNOWN kabi default false)
+SKIP_KNOWN = os.getenv("THEMUSE_SKIP_KNOWN", "false").strip().lower() in ("1", "true", "yes")
+
+# >1 bo'lsa keyword'lar K ta jarayonga bo'linadi (har birida o'z driver + DB connection); 4-8 dan oshirmang — RAM
+THEMUSE_WORKERS = max(1, min(int(os.getenv("THEMUSE_WORKERS", "1")), 8))
+WORKER_STAGGER = float(os.getenv("WORKER_STAGGER", "3"))  # uc chromedriver patch'i bir vaqtda to'qnashmasin
+
+# true -> uc/Selenium o'rniga Playwright (bitta CDP WebSocket, har buyruq uchun HTTP yo'q)
+USE_PLAYWRIGHT = os.getenv("USE_PLAYWRIGHT", "false").strip().lower() in ("1", "true", "yes")
+
+# ================== REGEX (har card uchun chaqiriladi -> bir marta compile) ==================
+_RE_WS = re.compile(r"\s+")
+# "Title - Location Posted ..." -> Location; birinchi " - " dan keyin, oxirgi qatordagi
+# "Posted on ..." / "Posted 3 days ago" dumisiz. (?=(\s*))\1 — atomik bo'shliq (backtrack qilmaydi)
+_RE_CARD_LOCATION = re.compile(
+    r" - (?=(\s*))\1(?P<loc>.*?)(?:\s+Posted(?: on|\s+\d+)[^\n]*)?\s*$",
+    re.I | re.S,
+)
+# faqat query qismiga qo'llanadi: birinchi bo'sh bo'lmagan job=... (parse_qs kabi)
+_RE_JOB_PARAM = re.compile(r"(?:^|&)job=([^&]+)")
+_RE_COMPANY_AT = re.compile(r"\bAt\s+([A-Za-z0-9&.,'’\- ]{2,80})\b")
+
+# posted date: 8 xil shakl bitta alternation'da (oldin 7 ta alohida search)
+_RE_POSTED_ALL = re.compile(
+    r"(?P<abs>posted on\s+(?P<mon>[a-z]+)\s+(?P<d>\d{1,2}),\s*(?P<y>\d{4}))"
+    r"|(?P<num>\b(?P<n1>\d{1,2})[/-](?P<n2>\d{1,2})[/-](?P<n3>\d{4})\b)"
+    r"|(?P<hrs>\b(?P<hrs_n>\d+)\s*(?:h|hr|hrs|hour|hours)\b)"
+    r"|(?P<days>\b(?P<days_n>\d+)\s*(?:d|day|days)\b)"
+    r"|(?P<wks>\b(?P<wks_n>\d+)\s*(?:w|week|weeks)\b)"
+    r"|(?P<mos>\b(?P<mos_n>\d+)\s*(?:mo|mos|month|months)\b)"
+    r"|(?P<today>today)"
+    r"|(?P<yday>yesterday)"
+)
+# ustuvorlik (eski if-zanjir tartibi): matnda qaysi biri birinchi kelishidan qat'i nazar
+_POSTED_KINDS = ("abs", "num", "hrs", "days", "wks", "mos", "today", "yday")
+
 
 # ================== DB ==================
 def open_db():
@@ -46,7 +123,7 @@ def open_db():
     if db_url:
         conn = psycopg2.connect(db_url)
         conn.autocommit = False
-        return conn
+        return tune_session(conn)
 
     host = os.getenv("PG_HOST") or os.getenv("DB_HOST")
     port = os.getenv("PG_PORT") or os.getenv("DB_PORT") or "5432"
@@ -67,6 +144,19 @@ def open_db():
         password=pwd,
     )
     conn.autocommit = False
+    return tune_session(conn)
+
+
+def tune_session(conn):
+    """
+    synchronous_commit=off: commit WAL fsync'ni kutmaydi. Crash bo'lsa oxirgi bir necha
+    sahifa yo'qolishi mumkin (DB izchil qoladi) — scraper keyingi yurishda qayta oladi.
+    """
+    if ASYNC_COMMIT:
+        with conn.cursor() as cur:
+            cur.execute("SET synchronous_commit = off;")
+        # SET tranzaksiyaviy: rollback bo'lsa qaytib ketmasin
+        conn.commit()
     return conn
 
 
@@ -96,45 +186,222 @@ def ensure_table(cur):
     )
     cur.execute("ALTER TABLE public.themuse ADD COLUMN IF NOT EXISTS job_subtitle TEXT;")
     cur.execute("ALTER TABLE public.themuse ADD COLUMN IF NOT EXISTS posted_date DATE;")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_themuse_posted_date ON public.themuse (posted_date);")
+    # posted_date deyarli append-only -> btree o'rniga kichik BRIN (insert'da random page write yo'q).
+    # Eski btree index'li bazalar uchun: bir martalik `python themuse_main.py --migrate-brin`
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_themuse_posted_date ON public.themuse USING BRIN (posted_date);")
     cur.execute("CREATE INDEX IF NOT EXISTS idx_themuse_job_subtitle ON public.themuse (job_subtitle);")
 
 
-def upsert_jobs(cur, rows: List[Dict[str, Any]]):
-    if not rows:
+def migrate_posted_date_brin(conn):
+    """
+    Bir martalik migratsiya: btree idx_themuse_posted_date -> BRIN.
+    CONCURRENTLY — scraper'lar yozishda davom etadi (tranzaksiyadan tashqarida bajariladi).
+    """
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT 1 FROM pg_indexes
+                WHERE schemaname = 'public' AND indexname = 'idx_themuse_posted_date'
+                  AND indexdef NOT ILIKE '%USING brin%';
+                """
+            )
+            if not cur.fetchone():
+                print("[MIGRATE] idx_themuse_posted_date allaqachon BRIN (yoki yo'q) — o'zgarish yo'q")
+                return
+            # avval yangisi, keyin eskisi o'chiriladi — oraliqda posted_date index'siz qolmaydi
+            cur.execute("DROP INDEX CONCURRENTLY IF EXISTS public.idx_themuse_posted_date_brin;")
+            cur.execute(
+                "CREATE INDEX CONCURRENTLY idx_themuse_posted_date_brin ON public.themuse USING BRIN (posted_date);"
+            )
+            cur.execute("DROP INDEX CONCURRENTLY public.idx_themuse_posted_date;")
+            cur.execute("ALTER INDEX public.idx_themuse_posted_date_brin RENAME TO idx_themuse_posted_date;")
+            print("[MIGRATE] idx_themuse_posted_date -> BRIN")
+    finally:
+        conn.autocommit = False
+
+
+def prepare_session(cur):
+    """
+    Har connection uchun: TEMP staging jadval + PREPARE (ensure_table'dan keyin, har worker o'zida).
+    """
+    # COPY uchun staging: sessiya davomida yashaydi, har commit'da o'zi tozalanadi
+    cur.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS tmp_themuse (
+            job_id VARCHAR(200),
+            source VARCHAR(50),
+            job_title VARCHAR(500),
+            company_name VARCHAR(500),
+            location VARCHAR(255),
+            salary VARCHAR(255),
+            job_type VARCHAR(255),
+            skills TEXT,
+            education VARCHAR(255),
+            job_url TEXT,
+            job_subtitle TEXT,
+            posted_date DATE
+        ) ON COMMIT DELETE ROWS;
+        """
+    )
+    prepare_insert(cur)
+
+
+_COLS = (
+    "job_id",
+    "source",
+    "job_title",
+    "company_name",
+    "location",
+    "salary",
+    "job_type",
+    "skills",
+    "education",
+    "job_url",
+    "job_subtitle",
+    "posted_date",
+)
+# _COLS bilan bir xil tartibda — unnest massivlari turi
+_COL_TYPES = (
+    "varchar", "varchar", "varchar", "varchar", "varchar", "varchar",
+    "varchar", "text", "varchar", "text", "text", "date",
+)
+_I_LOCATION = _COLS.index("location")
+_I_POSTED_DATE = _COLS.index("posted_date")
+
+
+def prepare_insert(cur):
+    """
+    Server-side prepared INSERT (sessiya uchun bir marta): har batch'da parse/plan qilinmaydi.
+    Ustun-massivlar bilan: butun batch bitta EXECUTE, 12 ta parametr (qator soniga bog'liq emas).
+    """
+    cur.execute("SELECT 1 FROM pg_prepared_statements WHERE name = 'themuse_ins';")
+    if cur.fetchone():
         return
+    arrays = ", ".join(f"${i}" for i in range(1, len(_COLS) + 1))
+    cur.execute(
+        f"""
+        PREPARE themuse_ins ({", ".join(t + "[]" for t in _COL_TYPES)}) AS
+        INSERT INTO public.themuse ({",".join(_COLS)})
+        SELECT * FROM unnest({arrays})
+        ON CONFLICT (job_id, source) DO NOTHING;
+        """
+    )
 
-    cols = [
-        "job_id",
-        "source",
-        "job_title",
-        "company_name",
-        "location",
-        "salary",
-        "job_type",
-        "skills",
-        "education",
-        "job_url",
-        "job_subtitle",
-        "posted_date",
-    ]
-    values = [tuple(r.get(c) for c in cols) for r in rows]
 
-    sql = f"""
-        INSERT INTO public.themuse ({",".join(cols)})
-        VALUES %s
+def copy_upsert(cur, values: List[Tuple]) -> int:
+    """
+    COPY -> tmp_themuse, keyin bitta INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+    returns: haqiqatda qo'shilgan qatorlar (conflict'dagilar hisobga kirmaydi).
+    """
+    cols = ",".join(_COLS)
+
+    buf = io.StringIO()
+    csv.writer(buf).writerows(values)
+    buf.seek(0)
+
+    cur.copy_expert(f"COPY tmp_themuse ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+    cur.execute(
+        f"""
+        INSERT INTO public.themuse ({cols})
+        SELECT {cols} FROM tmp_themuse
         ON CONFLICT (job_id, source) DO NOTHING;
+        """
+    )
+    inserted = cur.rowcount
+    # ON COMMIT DELETE ROWS commit'ni kutadi; bitta tranzaksiyada ikkinchi flush bo'lsa ham qayta yozilmasin
+    cur.execute("TRUNCATE tmp_themuse;")
+    return inserted
+
+
+def upsert_jobs(cur, values: List[Tuple]) -> int:
+    """
+    values — build_row() tuple'lari (_COLS tartibida), qayta yig'ilmaydi.
+    returns: haqiqatda qo'shilgan qatorlar (ON CONFLICT DO NOTHING o'tkazganlari hisobga kirmaydi).
     """
-    execute_values(cur, sql, values, page_size=200)
+    if not values:
+        return 0
 
+    # katta batch -> COPY; kichigida prepared themuse_ins (unnest)
+    if len(values) >= COPY_MIN_ROWS:
+        return copy_upsert(cur, values)
 
-def flush_to_db(conn, cur, batch_rows: List[Dict[str, Any]]):
-    if not batch_rows:
-        return
-    upsert_jobs(cur, batch_rows)
+    # qatorlar -> ustunlar; har massivga aniq tur (hammasi NULL bo'lsa ham date[]/varchar[] bo'lib ketadi)
+    columns = [list(col) for col in zip(*values)]
+    placeholders = ", ".join(f"%s::{t}[]" for t in _COL_TYPES)
+    cur.execute(f"EXECUTE themuse_ins ({placeholders})", columns)
+    # bitta EXECUTE -> rowcount butun batch uchun
+    return cur.rowcount
+
+
+# log uchun jamlanma hisob (har flush'da SELECT COUNT(*) — jadval kattalashgan sari seq scan — o'rniga)
+# _page_inserted: ochiq tranzaksiyadagi; commit_page'da _inserted_total'ga o'tadi, rollback_page'da tashlanadi
+_inserted_total = 0
+_page_inserted = 0
+
+
+def flush_buffer(cur, batch_rows: List[Tuple]):
+    """
+    Buffer'ni ochiq tranzaksiyaga yozadi (commit yo'q) va tozalaydi.
+    """
+    global _page_inserted
+    if batch_rows:
+        inserted = upsert_jobs(cur, batch_rows)
+        _page_inserted += inserted
+        print(f"[DB] batch={len(batch_rows)} inserted={inserted}")
+        batch_rows.clear()
+
+
+def load_known_ids(conn) -> FrozenSet[str]:
+    """
+    DB dagi mavjud job_id'lar — jarayon boshida bitta SELECT.
+    Named (server-side) cursor -> katta jadvalda ham xotiraga bo'lib-bo'lib keladi.
+    """
+    with conn.cursor(name="themuse_known_ids") as cur:
+        cur.itersize = 10000
+        cur.execute("SELECT job_id FROM public.themuse WHERE source = %s;", (SOURCE_NAME,))
+        known = frozenset(r[0] for r in cur)
+    conn.commit()
+    return known
+
+
+def approx_row_count(cur) -> int:
+    """
+    public.themuse qatorlari taxminan (pg_class.reltuples, O(1)) — aniq COUNT(*) kerak bo'lmagan log uchun.
+    """
+    cur.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = 'public.themuse'::regclass;")
+    row = cur.fetchone()
+    return max(int(row[0]), 0) if row else 0
+
+
+def commit_page(conn):
+    """
+    Sahifa oxirida bitta commit — shu paytgacha qilingan flush_buffer'lar bitta tranzaksiyada.
+    """
+    global _inserted_total, _page_inserted
     conn.commit()
-    print(f"[DB] inserted_try={len(batch_rows)}")
-    batch_rows.clear()
+    _inserted_total += _page_inserted
+    _page_inserted = 0
+
+
+def rollback_page(conn):
+    global _page_inserted
+    conn.rollback()
+    _page_inserted = 0
+
+
+def flush_commit(conn, cur, batch_rows: List[Tuple]):
+    """
+    Buffer'ni yozib commit qiladi; DB xatosida rollback — buffer baribir tashlanadi.
+    """
+    try:
+        flush_buffer(cur, batch_rows)
+        commit_page(conn)
+    except Exception as e:
+        rollback_page(conn)
+        print("[DB ERR]", repr(e))
+        batch_rows.clear()
 
 
 # ================== SELENIUM ==================
@@ -149,51 +416,107 @@ def create_driver():
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--lang=en-US")
     options.add_argument("--disable-gpu")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-    )
+    options.add_argument(f"user-agent={USER_AGENT}")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+
+    # rasm/font/CSS kerak emas — faqat matn o'qiymiz
+    prefs = {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+    }
+    options.add_experimental_option("prefs", prefs)
 
     driver = uc.Chrome(options=options)
     driver.set_page_load_timeout(60)
+
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd(
+            "Network.setBlockedURLs",
+            {
+                "urls": [
+                    "*.png",
+                    "*.jpg",
+                    "*.jpeg",
+                    "*.gif",
+                    "*.webp",
+                    "*.svg",
+                    "*.css",
+                    "*.woff",
+                    "*.woff2",
+                    "*.ttf",
+                    "*.mp4",
+                    "*google-analytics*",
+                    "*googletagmanager*",
+                    "*doubleclick*",
+                ]
+            },
+        )
+    except Exception:
+        pass
+
     return driver
 
 
 def wait(driver, timeout=DEFAULT_WAIT):
-    return WebDriverWait(driver, timeout)
+    # default timeout'li WebDriverWait driver'ga bir marta biriktiriladi (har chaqiruvda yangi obyekt yo'q)
+    if timeout != DEFAULT_WAIT:
+        return WebDriverWait(driver, timeout)
+    w = getattr(driver, "_themuse_wait", None)
+    if w is None:
+        w = driver._themuse_wait = WebDriverWait(driver, DEFAULT_WAIT)
+    return w
 
 
 def safe_click(driver, el) -> bool:
+    """
+    Stale element yutilmaydi — chaqiruvchi card'larni qayta o'qishi kerak.
+    """
     try:
         driver.execute_script("arguments[0].scrollIntoView({block:'center'});", el)
-        time.sleep(0.08)
         el.click()
         return True
+    except StaleElementReferenceException:
+        raise
     except Exception:
         try:
             driver.execute_script("arguments[0].click();", el)
             return True
+        except StaleElementReferenceException:
+            raise
         except Exception:
             return False
 
 
-def close_popups(driver):
-    candidates = [
-        (By.XPATH, "//button[contains(@aria-label,'Close') or contains(@aria-label,'close')]"),
-        (By.XPATH, "//button[contains(.,'Close') or contains(.,'close')]"),
-        (By.XPATH, "//button[contains(.,'Accept') or contains(.,'Got it') or contains(.,'I Accept')]"),
-    ]
-    for by, sel in candidates:
-        try:
-            for e in driver.find_elements(by, sel)[:2]:
-                if e.is_displayed():
-                    try:
-                        driver.execute_script("arguments[0].click();", e)
-                    except Exception:
-                        pass
-                    time.sleep(0.2)
-        except Exception:
-            pass
+# Popup/cookie banner'larni brauzerning o'zi yopadi: sahifaga bir marta qo'yiladi,
+# har card'da 3 ta XPath find_elements round-trip qilinmaydi
+JS_POPUP_CLOSER = r"""
+if (window.__themusePopupCloser) return;
+window.__themusePopupCloser = true;
+const TEXT_RE = /^(close|accept|got it|i accept)$/i;
+let queued = false;
+const sweep = () => {
+  queued = false;
+  document.querySelectorAll("button").forEach(b => {
+    if (b.offsetParent === null) return;
+    const label = b.getAttribute("aria-label") || "";
+    const text = (b.innerText || "").trim();
+    if (/close/i.test(label) || TEXT_RE.test(text)) b.click();
+  });
+};
+sweep();
+new MutationObserver(() => {
+  if (!queued) { queued = true; setTimeout(sweep, 100); }
+}).observe(document.body, {childList: true, subtree: true});
+"""
+
+
+def install_popup_closer(driver):
+    try:
+        driver.execute_script(JS_POPUP_CLOSER)
+    except Exception:
+        pass
 
 
 def close_extra_tabs(driver, main_handle: str):
@@ -211,168 +534,254 @@ def close_extra_tabs(driver, main_handle: str):
 
 
 # ================== URL / CARD HELPERS ==================
-def build_search_url(keyword: str, page: int) -> str:
+XPATH_VIEW_JOB = "//*[contains(translate(.,'view job','VIEW JOB'),'VIEW JOB')]"
+XPATH_H1_MAIN = "//main//h1"
+
+
+def search_url_template(keyword: str) -> str:
+    """
+    Keyword bir marta quote qilinadi; sahifa URL'i: template.format(page).
+    """
     kw = urllib.parse.quote(keyword.strip(), safe="")
-    return f"{BASE_URL}/keyword/{kw}?page={page}"
+    return f"{BASE_URL}/keyword/{kw}?page={{}}"
 
 
 def parse_job_id_from_url(url: str) -> str:
-    try:
-        parsed = urllib.parse.urlparse(url)
-        qs = urllib.parse.parse_qs(parsed.query)
-        job_param = qs.get("job", [None])[0]
-        if job_param:
-            return urllib.parse.unquote(job_param)
-    except Exception:
-        pass
-    return url
+    return job_id_from_href(url) or url
+
+
+def job_id_from_href(href: Optional[str]) -> Optional[str]:
+    """
+    Faqat ?job=... bo'lsa id qaytaradi (parse_job_id_from_url kabi butun URL'ga qaytmaydi).
+    urlparse + parse_qs o'rniga bitta regex; dekodlash o'sha-o'sha (parse_qs '+'/%XX, keyin yana unquote),
+    DB dagi eski job_id'lar bilan mos kelishi uchun.
+    """
+    if not href:
+        return None
+    query = href.partition("#")[0].partition("?")[2]
+    m = _RE_JOB_PARAM.search(query)
+    return urllib.parse.unquote(urllib.parse.unquote_plus(m.group(1))) if m else None
 
 
 def parse_location_from_card_text(card_text: str) -> Optional[str]:
     # Some cards show: "Title - Location Posted ..."
-    if " - " in card_text:
-        loc = card_text.split(" - ", 1)[1].strip()
-        loc = re.sub(r"\s+Posted on.*$", "", loc, flags=re.IGNORECASE).strip()
-        loc = re.sub(r"\s+Posted\s+\d+.*$", "", loc, flags=re.IGNORECASE).strip()
-        return loc or None
-    return None
+    m = _RE_CARD_LOCATION.search(card_text)
+    return (m.group("loc").strip() or None) if m else None
 
 
 def wait_left_list(driver):
     wait(driver).until(
         EC.presence_of_element_located(
-            (By.XPATH, "//*[contains(translate(.,'view job','VIEW JOB'),'VIEW JOB')]")
+            (By.XPATH, XPATH_VIEW_JOB)
         )
     )
 
 
-def get_left_cards(driver) -> List[Tuple[Any, Any]]:
-    view_els = driver.find_elements(
-        By.XPATH,
-        "//*[self::a or self::button][contains(translate(.,'view job','VIEW JOB'),'VIEW JOB')]"
-    )
+# "View job" tugmalari + ularning card matni/href'i — bitta execute_script bilan
+# (oldin: XPath find_elements + har card uchun ancestor find_element + .text)
+JS_LEFT_CARDS = r"""
+return Array.from(document.querySelectorAll("a, button"))
+  .filter((e) => /view job/i.test(e.textContent || ""))
+  .map((e) => {
+    const d = e.closest("div");
+    const card = d ? d.parentElement : null;
+    return {
+      el: e,
+      text: card ? (card.innerText || "").trim() : "",
+      href: e.href || e.getAttribute("href") || null,
+    };
+  });
+"""
+
+
+def get_left_cards(driver) -> List[Dict[str, Any]]:
+    """
+    [{"el": WebElement ("View job"), "text": card matni, "href": link yoki None}, ...]
+    """
+    return driver.execute_script(JS_LEFT_CARDS) or []
+
+
+# Detail panel: matn, title nomzodlari va company nomzodlari — bitta execute_script
+# (oldin: har biri alohida find_element + .text, har card uchun ~6 WebDriver so'rov)
+JS_DETAIL = r"""
+const byXPath = (xp) => document.evaluate(
+  xp, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+const txt = (el) => el ? (el.innerText || "").trim() : "";
+const main = document.querySelector("main");
+return {
+  body: txt(main) || txt(document.body),
+  titles: [txt(byXPath("//main//h1")), txt(byXPath("//h1"))],
+  companies: arguments[0].map((xp) => txt(byXPath(xp))),
+};
+"""
+
+COMPANY_XPATHS = [
+    "//main//h1/preceding::*[self::a or self::span][1]",
+    "//main//h1/preceding::a[1]",
+    "//a[contains(@href,'/profiles/')][1]",
+]
+
+
+def read_detail(driver) -> Tuple[Optional[str], Optional[str], str]:
+    """
+    Ochiq detail panel -> (title, company, detail_text).
+    """
+    return detail_from_js(driver.execute_script(JS_DETAIL, COMPANY_XPATHS))
 
-    cards = []
-    for el in view_els:
-        try:
-            card = el.find_element(By.XPATH, "ancestor::div[1]/ancestor::div[1]")
-            cards.append((card, el))
-        except Exception:
-            cards.append((None, el))
-    return cards
 
+def detail_from_js(data: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Optional[str], str]:
+    """
+    JS_DETAIL natijasi -> (title, company, detail_text). Selenium va Playwright uchun umumiy.
+    """
+    data = data or {}
+    detail_text = data.get("body") or ""
 
-def extract_right_text(driver) -> str:
-    try:
-        root = driver.find_element(By.XPATH, "//main")
-        txt = (root.text or "").strip()
-        if txt:
-            return txt
-    except Exception:
-        pass
-    try:
-        return (driver.find_element(By.TAG_NAME, "body").text or "").strip()
-    except Exception:
-        return ""
+    title = None
+    for t in data.get("titles") or []:
+        if t and "jobs" not in t.lower():
+            title = t
+            break
 
+    return title, pick_company(data.get("companies") or [], detail_text), detail_text
 
-def extract_title(driver) -> Optional[str]:
-    for sel in ("//main//h1", "//h1"):
-        try:
-            t = (driver.find_element(By.XPATH, sel).text or "").strip()
-            if t and "jobs" not in t.lower():
-                return t
-        except Exception:
-            pass
-    return None
+
+def pick_company(candidates: List[str], detail_text: str) -> Optional[str]:
+    """
+    COMPANY_XPATHS tartibidagi nomzodlardan birinchi yaroqlisi, bo'lmasa matndagi "At ...".
+    Selenium/Playwright (JS_DETAIL) va HTTP (parse_detail_html) yo'llari uchun umumiy.
+    """
+    for tx in candidates:
+        if tx and len(tx) < 120 and tx.lower() not in ("jobs", "companies", "advice", "coaching"):
+            return tx
+    return company_from_text(detail_text)
 
 
 def company_from_text(detail_text: str) -> Optional[str]:
-    m = re.search(r"\bAt\s+([A-Za-z0-9&.,'’\- ]{2,80})\b", detail_text)
+    m = _RE_COMPANY_AT.search(detail_text)
     if m:
         name = m.group(1).strip()
         return name.split(" - ")[0].strip()
     return None
 
 
-def extract_company(driver, detail_text: str) -> Optional[str]:
-    selectors = [
-        "//main//h1/preceding::*[self::a or self::span][1]",
-        "//main//h1/preceding::a[1]",
-        "//a[contains(@href,'/profiles/')][1]",
-    ]
-    for sel in selectors:
-        try:
-            el = driver.find_element(By.XPATH, sel)
-            tx = (el.text or "").strip()
-            if tx and len(tx) < 120 and tx.lower() not in ("jobs", "companies", "advice", "coaching"):
-                return tx
-        except Exception:
-            pass
-    return company_from_text(detail_text)
+# salary / job_type / education — detail matn ustidan bitta finditer.
+# Lookahead (?=...) — match matnni "yemaydi": "msccontract" da ham msc, ham contract topiladi
+# (eski `in` tekshiruvlari kabi; oddiy alternation ikkinchisini yo'qotardi)
+_RE_PARSE_ALL = re.compile(
+    r"(?=(?P<salary>[$£€]\s?\d[\d,]*(?:\s?-\s?[$£€]?\s?\d[\d,]*)?)"
+    r"|(?P<ft>full[- ]time)"
+    r"|(?P<pt>part[- ]time)"
+    r"|(?P<ct>contract)"
+    r"|(?P<intern>intern)"
+    r"|(?P<phd>phd|doctorate)"
+    r"|(?P<ms>master|msc)"
+    r"|(?P<bs>bachelor|undergraduate degree)"
+    r"|(?P<deg>degree))"
+)
 
+# tartib = ustuvorlik (matnda qaysi biri oldin kelishidan qat'i nazar)
+_JOB_TYPE_GROUPS = (("ft", "Full-time"), ("pt", "Part-time"), ("ct", "Contract"), ("intern", "Internship"))
+_EDUCATION_GROUPS = (("phd", "PhD"), ("ms", "Master"), ("bs", "Bachelor"), ("deg", "Degree required"))
 
-def extract_salary(text: str) -> Optional[str]:
-    m = re.search(r"(\$|£|€)\s?\d[\d,]*(\s?-\s?(\$|£|€)?\s?\d[\d,]*)?", text)
-    return m.group(0).strip() if m else None
 
+def normalize_detail_text(detail_text: Optional[str]) -> str:
+    """
+    Job uchun bir marta: lower + bo'shliqlar bitta probelga, chetlarida probel (skill so'z chegarasi uchun).
+    """
+    return " " + _RE_WS.sub(" ", (detail_text or "").lower()) + " "
 
-def detect_job_type(text: str) -> Optional[str]:
-    t = text.lower()
-    if "full-time" in t or "full time" in t:
-        return "Full-time"
-    if "part-time" in t or "part time" in t:
-        return "Part-time"
-    if "contract" in t:
-        return "Contract"
-    if "intern" in t or "internship" in t:
-        return "Internship"
-    return None
 
+def parse_detail_fields(norm: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    norm — normalize_detail_text() natijasi.
+    returns: (salary, job_type, education)
+    """
+    salary = None
+    hits = set()
+    for m in _RE_PARSE_ALL.finditer(norm):
+        kind = m.lastgroup
+        if kind == "salary":
+            if salary is None:
+                salary = m.group("salary").strip()
+        else:
+            hits.add(kind)
 
-def detect_education(text: str) -> Optional[str]:
-    t = text.lower()
-    if "phd" in t or "doctorate" in t:
-        return "PhD"
-    if "master" in t or "msc" in t:
-        return "Master"
-    if "bachelor" in t or "undergraduate degree" in t:
-        return "Bachelor"
-    if "degree" in t:
-        return "Degree required"
-    return None
+    job_type = next((v for k, v in _JOB_TYPE_GROUPS if k in hits), None)
+    education = next((v for k, v in _EDUCATION_GROUPS if k in hits), None)
+    return salary, job_type, education
 
 
-def extract_skills(text: str) -> Optional[str]:
-    skills = [
-        "python", "java", "javascript", "typescript", "react", "react native",
-        "node", "django", "flask", "fastapi", "sql", "postgres", "mysql",
-        "mongodb", "redis", "aws", "azure", "gcp", "docker", "kubernetes"
-    ]
-    t = " " + re.sub(r"\s+", " ", text.lower()) + " "
-    found = sorted({s for s in skills if f" {s} " in t})
+_SKILLS = [
+    "python", "java", "javascript", "typescript", "react", "react native",
+    "node", "django", "flask", "fastapi", "sql", "postgres", "mysql",
+    "mongodb", "redis", "aws", "azure", "gcp", "docker", "kubernetes"
+]
+
+
+def _build_skills_matcher():
+    """
+    Matn bir marta o'qiladi: pyahocorasick bo'lsa automaton, bo'lmasa bitta union regex.
+    Ikkalasi ham eski `f" {s} " in t` bilan bir xil natija beradi.
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for sk in _SKILLS:
+            automaton.add_word(f" {sk} ", sk)
+        automaton.make_automaton()
+        return lambda t: {sk for _, sk in automaton.iter(t)}
+
+    # regex bir joydan faqat bitta (eng uzun) match beradi: "react native" topilsa "react" ham qo'shiladi
+    implies = {sk: {o for o in _SKILLS if o != sk and f" {o} " in f" {sk} "} for sk in _SKILLS}
+    union = "|".join(map(re.escape, sorted(_SKILLS, key=len, reverse=True)))
+    skills_re = re.compile(r"(?<= )(" + union + r")(?= )")
+
+    def match(t: str) -> set:
+        found = set(skills_re.findall(t))
+        for sk in list(found):
+            found |= implies[sk]
+        return found
+
+    return match
+
+
+_SKILLS_MATCH = _build_skills_matcher()
+
+
+def extract_skills(norm: str) -> Optional[str]:
+    """
+    norm — normalize_detail_text() natijasi (chaqiruvchida bir marta, parse_detail_fields bilan umumiy).
+    """
+    found = sorted(_SKILLS_MATCH(norm))
     return ", ".join(found) if found else None
 
 
+class StaleCardError(Exception):
+    """Card ro'yxati qayta chizilgan (Playwright) — StaleElementReferenceException bilan bir xil ishlanadi."""
+
+
 def click_card_and_wait_detail(driver, el, main_handle: str):
     try:
         driver.execute_script("arguments[0].removeAttribute('target');", el)
+    except StaleElementReferenceException:
+        raise
     except Exception:
         pass
 
     old_title = ""
     try:
-        old_title = (driver.find_element(By.XPATH, "//main//h1").text or "").strip()
+        old_title = (driver.find_element(By.XPATH, XPATH_H1_MAIN).text or "").strip()
     except Exception:
         pass
 
-    safe_click(driver, el)
-    time.sleep(0.25)
-    close_extra_tabs(driver, main_handle)
+    # click bo'lmasa title_changed'ni DEFAULT_WAIT kutib, oldingi job URL'ini o'qimaymiz
+    if not safe_click(driver, el):
+        raise RuntimeError("card click failed")
 
+    # qat'iy sleep o'rniga: h1 yangi vakansiya nomiga o'zgarguncha kutiladi
     def title_changed(d):
         try:
-            t = (d.find_element(By.XPATH, "//main//h1").text or "").strip()
+            t = (d.find_element(By.XPATH, XPATH_H1_MAIN).text or "").strip()
             return t and t != old_title and "jobs" not in t.lower()
         except Exception:
             return False
@@ -380,7 +789,128 @@ def click_card_and_wait_detail(driver, el, main_handle: str):
     try:
         wait(driver).until(title_changed)
     except TimeoutException:
-        wait(driver).until(EC.presence_of_element_located((By.XPATH, "//main//h1")))
+        wait(driver).until(EC.presence_of_element_located((By.XPATH, XPATH_H1_MAIN)))
+    close_extra_tabs(driver, main_handle)
+
+
+# ================== HTTP DETAIL (click'siz) ==================
+def make_http_session() -> requests.Session:
+    """
+    Keyword uchun bitta session: keep-alive ulanishlar sahifalar orasida qayta ishlatiladi.
+    """
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"})
+    # pool FETCH_WORKERS'ga teng, aks holda urllib3 "pool is full" deb ulanishni tashlaydi
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=FETCH_WORKERS)
+    session.mount("https://", adapter)
+    return session
+
+
+def load_cookies(session: requests.Session, cookies: List[Dict[str, Any]]) -> requests.Session:
+    """
+    cookies — driver.get_cookies() yoki Playwright context.cookies() (ikkalasida name/value/domain/path).
+    """
+    for c in cookies:
+        session.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+    return session
+
+
+def fetch_detail_html(session: requests.Session, href: str) -> Optional[str]:
+    if FETCH_JITTER > 0:
+        time.sleep(random.uniform(0, FETCH_JITTER))
+    try:
+        r = session.get(href, timeout=HTTP_TIMEOUT)
+        r.raise_for_status()
+        return r.text
+    except Exception as e:
+        # 403/429/timeout — click'ga qaytiladi, lekin sababi ko'rinib tursin
+        print(f"  [HTTP ERR] {href} -> {type(e).__name__}: {e}")
+        return None
+
+
+def _preceding(el, names: Tuple[str, ...]):
+    """
+    XPath preceding::*[self::a or ...][1] — el'dan oldingi eng yaqin teg (ajdodlar hisobga kirmaydi).
+    """
+    ancestors = {id(p) for p in el.parents}
+    for prev in el.previous_elements:
+        if getattr(prev, "name", None) in names and id(prev) not in ancestors:
+            return prev
+    return None
+
+
+def company_candidates_html(soup) -> List[str]:
+    """
+    COMPANY_XPATHS'ning BeautifulSoup'dagi aynan o'sha tartibi: h1 oldidagi a/span, h1 oldidagi a, /profiles/ link.
+    """
+    main = soup.find("main")
+    h1 = main.find("h1") if main else None
+    els = [
+        _preceding(h1, ("a", "span")) if h1 else None,
+        _preceding(h1, ("a",)) if h1 else None,
+        soup.select_one("a[href*='/profiles/']"),
+    ]
+    return [el.get_text(" ", strip=True) if el else "" for el in els]
+
+
+def parse_detail_html(html: Optional[str]) -> Optional[Tuple[Optional[str], Optional[str], str]]:
+    """
+    Detail sahifa HTML -> (title, company, detail_text).
+    Sahifa to'liq server-render bo'lmasa (title/matn yo'q) -> None, chaqiruvchi click'ga qaytadi.
+    """
+    if not html:
+        return None
+
+    soup = BeautifulSoup(html, "html.parser")
+    root = soup.find("main") or soup.body
+    if root is None:
+        return None
+
+    detail_text = root.get_text("\n", strip=True)
+
+    title = None
+    for h1 in (root.find("h1"), soup.find("h1")):
+        t = h1.get_text(" ", strip=True) if h1 else ""
+        if t and "jobs" not in t.lower():
+            title = t
+            break
+
+    if not title or not detail_text:
+        return None
+
+    return title, pick_company(company_candidates_html(soup), detail_text), detail_text
+
+
+def prefetch_details(
+        session: requests.Session,
+        cards: List[Dict[str, Any]],
+        skip_ids: set,
+        known_ids: FrozenSet[str] = frozenset(),
+) -> Dict[str, Tuple[Optional[str], Optional[str], str]]:
+    """
+    Sahifadagi href'ida id bor card'lar detail'ini parallel oladi (I/O), parse ketma-ket.
+    returns: {href: (title, company, detail_text)} — faqat muvaffaqiyatli parse bo'lganlari.
+    """
+    hrefs = []
+    for c in cards:
+        href = c.get("href")
+        href_id = job_id_from_href(href)
+        if href_id and href_id not in skip_ids and href_id not in known_ids and href not in hrefs:
+            hrefs.append(href)
+    if not hrefs:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
+        htmls = list(ex.map(lambda h: fetch_detail_html(session, h), hrefs))
+
+    out = {}
+    for href, html in zip(hrefs, htmls):
+        detail = parse_detail_html(html)
+        if detail is not None:
+            out[href] = detail
+        elif html:
+            print(f"  [HTTP] title/matn topilmadi, click qilinadi: {href}")
+    return out
 
 
 # ================== ✅ POSTED DATE PARSER ==================
@@ -418,58 +948,53 @@ def parse_posted_date(text: str) -> Optional[datetime.date]:
     if not t:
         return None
 
+    # bitta o'tish: har turning birinchi uchragani (eski .search() bilan bir xil)
+    first: Dict[str, re.Match] = {}
+    for m in _RE_POSTED_ALL.finditer(t):
+        first.setdefault(m.lastgroup, m)
+    if not first:
+        return None
+
     today = datetime.date.today()
 
-    # absolute month name: posted on jan 23, 2026
-    m = re.search(r"posted on\s+([a-z]+)\s+(\d{1,2}),\s*(\d{4})", t, flags=re.I)
-    if m:
-        mon = _MONTHS.get(m.group(1).lower())
-        if mon:
-            try:
-                return datetime.date(int(m.group(3)), mon, int(m.group(2)))
-            except Exception:
-                pass
+    for kind in _POSTED_KINDS:
+        m = first.get(kind)
+        if m is None:
+            continue
 
-    # numeric date
-    m = re.search(r"\b(\d{1,2})[/-](\d{1,2})[/-](\d{4})\b", t)
-    if m:
-        a = int(m.group(1))
-        b = int(m.group(2))
-        y = int(m.group(3))
-        # assume US mm/dd/yyyy first
-        try:
-            return datetime.date(y, a, b)
-        except Exception:
+        # absolute month name: posted on jan 23, 2026
+        if kind == "abs":
+            mon = _MONTHS.get(m.group("mon"))
+            if mon:
+                try:
+                    return datetime.date(int(m.group("y")), mon, int(m.group("d")))
+                except Exception:
+                    pass
+
+        # numeric date — assume US mm/dd/yyyy first
+        elif kind == "num":
+            a, b, y = int(m.group("n1")), int(m.group("n2")), int(m.group("n3"))
             try:
-                return datetime.date(y, b, a)
+                return datetime.date(y, a, b)
             except Exception:
-                pass
-
-    # relative hours
-    m = re.search(r"\b(\d+)\s*(h|hr|hrs|hour|hours)\b", t)
-    if m:
-        hours = int(m.group(1))
-        return today - datetime.timedelta(days=(hours // 24))
-
-    # relative days
-    m = re.search(r"\b(\d+)\s*(d|day|days)\b", t)
-    if m:
-        return today - datetime.timedelta(days=int(m.group(1)))
-
-    # relative weeks
-    m = re.search(r"\b(\d+)\s*(w|week|weeks)\b", t)
-    if m:
-        return today - datetime.timedelta(days=int(m.group(1)) * 7)
-
-    # relative months (~30d)
-    m = re.search(r"\b(\d+)\s*(mo|mos|month|months)\b", t)
-    if m:
-        return today - datetime.timedelta(days=int(m.group(1)) * 30)
+                try:
+                    return datetime.date(y, b, a)
+                except Exception:
+                    pass
 
-    if "today" in t:
-        return today
-    if "yesterday" in t:
-        return today - datetime.timedelta(days=1)
+        elif kind == "hrs":
+            return today - datetime.timedelta(days=(int(m.group("hrs_n")) // 24))
+        elif kind == "days":
+            return today - datetime.timedelta(days=int(m.group("days_n")))
+        elif kind == "wks":
+            return today - datetime.timedelta(days=int(m.group("wks_n")) * 7)
+        # relative months (~30d)
+        elif kind == "mos":
+            return today - datetime.timedelta(days=int(m.group("mos_n")) * 30)
+        elif kind == "today":
+            return today
+        elif kind == "yday":
+            return today - datetime.timedelta(days=1)
 
     return None
 
@@ -487,148 +1012,436 @@ def load_keywords() -> List[str]:
     if not JOBS_PATH.exists():
         raise RuntimeError(f"job_list.json topilmadi: {JOBS_PATH}")
 
-    with open(JOBS_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    raw = JOBS_PATH.read_bytes()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
-    if isinstance(data, list):
-        return [str(x).strip() for x in data if str(x).strip()]
+    if isinstance(data, dict):
+        data = next(
+            (data[key] for key in ("keywords", "jobs", "job_titles") if isinstance(data.get(key), list)),
+            None,
+        )
 
-    for key in ("keywords", "jobs", "job_titles"):
-        if key in data and isinstance(data[key], list):
-            return [str(x).strip() for x in data[key] if str(x).strip()]
+    if isinstance(data, list):
+        return [s for s in (str(x).strip() for x in data) if s]
 
     raise RuntimeError("job_list.json format topilmadi. List yoki {keywords:[...]} bo‘lsin.")
 
 
 # ================== SCRAPER ==================
-def scrape_keyword(driver, keyword: str, conn):
-    cur = conn.cursor()
-    ensure_table(cur)
-    conn.commit()
+def build_row(
+        keyword: str,
+        job_id: str,
+        job_url: str,
+        title: Optional[str],
+        company: Optional[str],
+        card_text: str,
+        detail_text: Optional[str],
+) -> Tuple:
+    """
+    DB qatori to'g'ridan-to'g'ri _COLS tartibidagi tuple (oraliq dict yo'q).
+    """
+    posted_date = extract_posted_date(card_text, detail_text)
+    norm = normalize_detail_text(detail_text)
+    salary, job_type, education = parse_detail_fields(norm)
+
+    return (
+        job_id,
+        SOURCE_NAME,
+        title,
+        company,
+        parse_location_from_card_text(card_text),
+        salary,
+        job_type,
+        extract_skills(norm),
+        education,
+        job_url,
+        keyword,        # ✅ REQUIRED: job_subtitle
+        posted_date,
+    )
 
-    print(f"\n=== KEYWORD: {keyword} ===")
-    main_handle = driver.current_window_handle
 
-    for page in range(1, MAX_PAGES + 1):
-        url = build_search_url(keyword, page)
-        print(f"[OPEN] {url}")
+class SeleniumBackend:
+    """
+    scrape_keyword uchun brauzer adapteri (uc/Selenium). PlaywrightBackend bilan bir xil metodlar.
+    """
 
-        driver.get(url)
-        time.sleep(PAGE_SLEEP)
-        close_popups(driver)
+    def __init__(self, driver):
+        self.driver = driver
+        self.main_handle = driver.current_window_handle
 
+    def open(self, url: str) -> bool:
+        """False -> natija yo'q / bloklangan."""
+        self.driver.get(url)
+        install_popup_closer(self.driver)
         try:
-            wait_left_list(driver)
+            wait_left_list(self.driver)
+            return True
         except TimeoutException:
-            print(f"[STOP] No results/blocked keyword='{keyword}' page={page}")
-            break
+            return False
+
+    def cards(self) -> List[Dict[str, Any]]:
+        return get_left_cards(self.driver)
+
+    def cookies(self) -> List[Dict[str, Any]]:
+        return self.driver.get_cookies()
 
-        batch_rows: List[Dict[str, Any]] = []
-        seen_ids = set()
+    def before_card(self):
+        close_extra_tabs(self.driver, self.main_handle)
 
-        i = 0
-        while True:
-            close_popups(driver)
-            close_extra_tabs(driver, main_handle)
+    def click(self, cards: List[Dict[str, Any]], index: int) -> str:
+        """Card'ni bosib detail'ni kutadi; returns: job URL."""
+        click_card_and_wait_detail(self.driver, cards[index]["el"], self.main_handle)
+        return self.driver.current_url
 
-            cards = get_left_cards(driver)
-            if i >= len(cards):
+    def read_detail(self) -> Tuple[Optional[str], Optional[str], str]:
+        return read_detail(self.driver)
+
+    def close(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+def scrape_keyword(backend, keyword: str, conn, cur, known_ids: FrozenSet[str] = frozenset()):
+    """
+    backend — SeleniumBackend yoki PlaywrightBackend; sahifa/card oqimi ikkalasi uchun bitta.
+    """
+    print(f"\n=== KEYWORD: {keyword} ===")
+    # keyword bo'yicha umumiy: sahifalar orasidagi takrorlar ham click qilinmaydi
+    seen_ids = set()
+    http = make_http_session()
+    url_tmpl = search_url_template(keyword)
+
+    # buffer keyword bo'yicha: sahifalar osha to'planadi, BATCH_SIZE'ga yetganda sahifa oxirida yoziladi
+    batch_rows: List[Tuple] = []
+    try:
+        for page in range(1, MAX_PAGES + 1):
+            url = url_tmpl.format(page)
+            print(f"[OPEN] {url}")
+
+            if not backend.open(url):
+                print(f"[STOP] No results/blocked keyword='{keyword}' page={page}")
                 break
 
-            stale_retry = 0
-            while stale_retry < MAX_STALE_RETRY:
-                try:
-                    card, view_el = cards[i]
-                    card_text = (card.text or "").strip() if card is not None else ""
-                    location = parse_location_from_card_text(card_text)
+            page_new = 0
+            page_known = 0      # DB'da bor -> o'tkazib yuborilgan (bo'sh sahifa emas)
 
-                    click_card_and_wait_detail(driver, view_el, main_handle)
-                    time.sleep(0.2)
-                    close_popups(driver)
-                    close_extra_tabs(driver, main_handle)
+            # card'lar sahifa uchun bir marta o'qiladi; DOM qayta chizilsa (stale) qaytadan
+            cards = backend.cards()
 
-                    job_url = driver.current_url
-                    job_id = parse_job_id_from_url(job_url)
+            # sahifadagi hamma card oldin ko'rilgan bo'lsa — sayt bir xil ro'yxatni qaytaryapti, click'siz chiqamiz
+            card_ids = [job_id_from_href(c.get("href")) for c in cards]
+            if card_ids and all(cid and cid in seen_ids for cid in card_ids):
+                print(f"[STOP] all cards already seen keyword='{keyword}' page={page}")
+                break
 
-                    if not job_id or job_id in seen_ids:
-                        break
-                    seen_ids.add(job_id)
-
-                    detail_text = extract_right_text(driver)
-
-                    title = extract_title(driver)
-                    company = extract_company(driver, detail_text)
-                    posted_date = extract_posted_date(card_text, detail_text)
-
-                    row = {
-                        "job_id": job_id,
-                        "source": SOURCE_NAME,
-                        "job_title": title,
-                        "company_name": company,
-                        "location": location,
-                        "salary": extract_salary(detail_text),
-                        "job_type": detect_job_type(detail_text),
-                        "skills": extract_skills(detail_text),
-                        "education": detect_education(detail_text),
-                        "job_url": job_url,
-
-                        # ✅ REQUIRED
-                        "job_subtitle": keyword,
-                        "posted_date": posted_date,
-                    }
-
-                    batch_rows.append(row)
-                    print(f"  [JOB] {title} | {company} | {location} | posted_date={posted_date} | id={job_id}")
-
-                    if len(batch_rows) >= BATCH_SIZE:
-                        flush_to_db(conn, cur, batch_rows)
-
-                    time.sleep(PAGE_SLEEP)
-                    break
+            details = prefetch_details(load_cookies(http, backend.cookies()), cards, seen_ids, known_ids) if HTTP_DETAIL else {}
 
-                except StaleElementReferenceException:
-                    stale_retry += 1
-                    time.sleep(0.2)
-                    continue
-                except Exception as e:
-                    print("  [ERR]", repr(e))
+            i = 0
+            while True:
+                backend.before_card()
+
+                if i >= len(cards):
                     break
 
-            i += 1
+                stale_retry = 0
+                while stale_retry < MAX_STALE_RETRY:
+                    try:
+                        card_text = cards[i].get("text") or ""
+
+                        href = cards[i].get("href")
+                        href_id = job_id_from_href(href)
+                        if href_id and href_id in seen_ids:
+                            break
+                        if href_id and href_id in known_ids:
+                            seen_ids.add(href_id)   # qayta kelsa 'all seen' stop'i ushlaydi
+                            page_known += 1
+                            break
+
+                        # href'da id bor -> oldindan HTTP bilan olingan detail; bo'lmasa yoki parse bo'lmasa -> click
+                        detail = details.get(href) if href_id else None
+
+                        if detail is not None:
+                            job_url, job_id = href, href_id
+                            title, company, detail_text = detail
+                        else:
+                            job_url = backend.click(cards, i)
+                            job_id = parse_job_id_from_url(job_url)
+                            detail_text = title = company = None
+
+                        if not job_id or job_id in seen_ids:
+                            if detail is None:
+                                print(f"  [SKIP] already seen after click: {job_url}")
+                            break
+                        if job_id in known_ids:
+                            seen_ids.add(job_id)   # qayta kelsa 'all seen' stop'i ushlaydi
+                            page_known += 1
+                            break
+                        seen_ids.add(job_id)
+                        page_new += 1
+
+                        if detail is None:
+                            title, company, detail_text = backend.read_detail()
+
+                        row = build_row(keyword, job_id, job_url, title, company, card_text, detail_text)
+                        batch_rows.append(row)
+                        print(
+                            f"  [JOB] {title} | {company} | {row[_I_LOCATION]} | "
+                            f"posted_date={row[_I_POSTED_DATE]} | id={job_id}"
+                        )
+
+                        # throttle faqat brauzer navigatsiyasidan keyin (PAGE_SLEEP=0 -> yo'q)
+                        if detail is None and PAGE_SLEEP > 0:
+                            time.sleep(PAGE_SLEEP)
+                        break
+
+                    except (StaleElementReferenceException, StaleCardError):
+                        stale_retry += 1
+                        time.sleep(0.2)
+                        cards = backend.cards()
+                        if i >= len(cards):
+                            break
+                        continue
+                    except Exception as e:
+                        print("  [ERR]", repr(e))
+                        break
 
+                i += 1
+
+            if len(batch_rows) >= BATCH_SIZE:
+                flush_commit(conn, cur, batch_rows)
+
+            print(f"[PAGE DONE] page={page} unique_jobs={page_new} known={page_known} keyword_total={len(seen_ids)}")
+            if page_new == 0 and page_known == 0:
+                print(f"[STOP] empty list keyword='{keyword}' page={page}")
+                break
+    finally:
+        # keyword oxiri (break yoki xato): qolgan buffer yoziladi
+        flush_commit(conn, cur, batch_rows)
+
+
+# ================== PLAYWRIGHT (USE_PLAYWRIGHT=true) ==================
+PW_BLOCKED_TYPES = {"image", "font", "stylesheet", "media"}
+PW_BLOCKED_HOSTS = ("google-analytics", "googletagmanager", "doubleclick")
+
+# JS_LEFT_CARDS bilan bir xil; element qaytarilmaydi, card'ga index yoziladi (click uchun locator)
+JS_PW_CARDS = r"""
+return Array.from(document.querySelectorAll("a, button"))
+  .filter((e) => /view job/i.test(e.textContent || ""))
+  .map((e, i) => {
+    e.setAttribute("data-themuse-card", String(i));
+    const d = e.closest("div");
+    const card = d ? d.parentElement : null;
+    return {
+      text: card ? (card.innerText || "").trim() : "",
+      href: e.href || e.getAttribute("href") || null,
+    };
+  });
+"""
+
+JS_PW_TITLE_CHANGED = r"""
+(old) => {
+  const h = document.querySelector("main h1");
+  const t = h ? (h.innerText || "").trim() : "";
+  return t && t !== old && !/jobs/i.test(t);
+}
+"""
+
+
+def pw_eval(page, js: str, *args):
+    """
+    Selenium uslubidagi JS (return + arguments[i]) ni Playwright page'da bajaradi.
+    """
+    return page.evaluate("(args) => (function () {" + js + "}).apply(null, args)", list(args))
+
+
+def _pw_route(route):
+    req = route.request
+    if req.resource_type in PW_BLOCKED_TYPES or any(h in req.url for h in PW_BLOCKED_HOSTS):
+        route.abort()
+    else:
+        route.continue_()
+
+
+def create_pw_page():
+    """
+    returns: (playwright, browser, page)
+    """
+    if sync_playwright is None:
+        raise RuntimeError(
+            "USE_PLAYWRIGHT=true, lekin playwright o'rnatilmagan: pip install playwright && playwright install chromium"
+        )
+
+    pw = sync_playwright().start()
+    browser = pw.chromium.launch(
+        headless=HEADLESS,
+        args=[
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+            "--disable-blink-features=AutomationControlled",
+        ],
+    )
+    context = browser.new_context(
+        user_agent=USER_AGENT,
+        locale="en-US",
+        viewport={"width": 1920, "height": 1080},
+    )
+    context.route("**/*", _pw_route)
+
+    page = context.new_page()
+    page.set_default_timeout(DEFAULT_WAIT * 1000)
+    page.set_default_navigation_timeout(60_000)
+    # close_extra_tabs o'rniga: yangi tab ochilsa darhol yopiladi
+    context.on("page", lambda p: p.close())
+    return pw, browser, page
+
+
+def click_card_and_wait_detail_pw(page, index: int):
+    btn = page.locator(f'[data-themuse-card="{index}"]')
+    if btn.count() == 0:
+        # ro'yxat qayta chizilgan — boshqa card'ni bosib qo'ymaslik uchun chaqiruvchi qayta o'qiydi
+        raise StaleCardError(f"card {index} not in DOM")
+    old_title = pw_eval(page, 'const h = document.querySelector("main h1"); return h ? (h.innerText || "").trim() : "";')
+
+    btn.evaluate("(e) => e.removeAttribute('target')")
+    btn.scroll_into_view_if_needed()
+    btn.click()
+
+    try:
+        page.wait_for_function(JS_PW_TITLE_CHANGED, arg=old_title)
+    except PlaywrightTimeoutError:
+        page.locator("main h1").first.wait_for(state="visible")
+
+
+class PlaywrightBackend:
+    """
+    scrape_keyword uchun Playwright adapteri (SeleniumBackend bilan bir xil metodlar).
+    """
+
+    def __init__(self):
+        self.pw, self.browser, self.page = create_pw_page()
+
+    def open(self, url: str) -> bool:
+        self.page.goto(url, wait_until="domcontentloaded")
+        pw_eval(self.page, JS_POPUP_CLOSER)
         try:
-            flush_to_db(conn, cur, batch_rows)
-        except Exception as e:
-            conn.rollback()
-            print("[DB ERR]", repr(e))
-            batch_rows.clear()
-
-        print(f"[PAGE DONE] page={page} unique_jobs={len(seen_ids)}")
-        if len(seen_ids) == 0:
-            print(f"[STOP] empty list keyword='{keyword}' page={page}")
-            break
+            self.page.locator("text=/view job/i").first.wait_for(state="visible")
+            return True
+        except PlaywrightTimeoutError:
+            return False
 
+    def cards(self) -> List[Dict[str, Any]]:
+        return pw_eval(self.page, JS_PW_CARDS) or []
 
-def main():
-    keywords = load_keywords()
+    def cookies(self) -> List[Dict[str, Any]]:
+        return self.page.context.cookies()
+
+    def before_card(self):
+        # yangi tab'lar context.on("page") da o'zi yopiladi
+        pass
+
+    def click(self, cards: List[Dict[str, Any]], index: int) -> str:
+        click_card_and_wait_detail_pw(self.page, index)
+        return self.page.url
+
+    def read_detail(self) -> Tuple[Optional[str], Optional[str], str]:
+        return detail_from_js(pw_eval(self.page, JS_DETAIL, COMPANY_XPATHS))
+
+    def close(self):
+        try:
+            self.browser.close()
+            self.pw.stop()
+        except Exception:
+            pass
+
+
+def close_db(conn):
+    try:
+        conn.rollback()
+        with conn.cursor() as cur:
+            print(f"[DB] done: total_inserted={_inserted_total} themuse_rows~{approx_row_count(cur)}")
+    except Exception:
+        pass
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def run_keywords(keywords: List[str]) -> int:
+    """
+    Bitta jarayon: o'z DB connection'i va brauzeri bilan keyword'larni ketma-ket scrape qiladi.
+    returns: shu jarayonda DB ga qo'shilgan (commit bo'lgan) qatorlar soni.
+    """
     conn = open_db()
     print("[DB] connected:", conn.get_dsn_parameters())
 
-    driver = create_driver()
+    # TEMP table + PREPARE — connection uchun bir marta; shu cursor butun jarayon davomida ishlatiladi
+    cur = conn.cursor()
+    prepare_session(cur)
+    conn.commit()
+
+    known_ids = load_known_ids(conn) if SKIP_KNOWN else frozenset()
+    print(f"[DB] known job_ids={len(known_ids)}")
+
+    backend = PlaywrightBackend() if USE_PLAYWRIGHT else SeleniumBackend(create_driver())
     try:
         for kw in keywords:
             kw = kw.strip()
             if kw:
-                scrape_keyword(driver, kw, conn)
+                scrape_keyword(backend, kw, conn, cur, known_ids)
     finally:
+        backend.close()
+        close_db(conn)
+    return _inserted_total
+
+
+def keyword_worker(index: int, keywords: List[str]) -> int:
+    """
+    ProcessPool worker: driver fork'dan keyin shu jarayonning o'zida yaratiladi.
+    """
+    time.sleep(index * WORKER_STAGGER)
+    return run_keywords(keywords)
+
+
+def main():
+    if "--migrate-brin" in sys.argv[1:]:
+        conn = open_db()
         try:
-            driver.quit()
-        except Exception:
-            pass
-        try:
+            migrate_posted_date_brin(conn)
+        finally:
             conn.close()
-        except Exception:
-            pass
+        return
+
+    keywords = load_keywords()
+
+    # doimiy DDL (jadval/index) — bir marta, worker'lar parallel ALTER/CREATE INDEX qilmasin
+    conn = open_db()
+    try:
+        with conn.cursor() as cur:
+            ensure_table(cur)
+        conn.commit()
+    finally:
+        conn.close()
+
+    workers = min(THEMUSE_WORKERS, len(keywords))
+    if workers <= 1:
+        run_keywords(keywords)
+        return
+
+    # round-robin: har worker'ga taxminan teng keyword
+    shards = [keywords[i::workers] for i in range(workers)]
+    print(f"[POOL] workers={workers} keywords={len(keywords)}")
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futures = [ex.submit(keyword_worker, i, shard) for i, shard in enumerate(shards)]
+        total = 0
+        for fut in futures:
+            try:
+                total += fut.result()
+            except Exception as e:
+                print("[WORKER ERR]", repr(e))
+    print(f"[POOL DONE] total_inserted={total}")
 
 
 if __name__ == "__main__":